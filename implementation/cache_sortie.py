@@ -0,0 +1,116 @@
+"""
+Cache d'arbres des plus courts chemins vers la sortie.
+
+Quand un même labyrinthe reçoit des milliers de requêtes avec des départs
+différents mais la même sortie, relancer A* à chaque fois refait presque
+toute la recherche. On construit plutôt, à la première requête, l'arbre des
+plus courts chemins vers la sortie: un parcours en largeur depuis la sortie
+(champ_distances) donne la distance de chaque cellule, d'où l'on déduit pour
+chaque cellule son "parent", la cellule suivante vers la sortie. Les requêtes
+suivantes remontent simplement les parents depuis le départ, en temps
+proportionnel à la longueur du chemin.
+
+Le cache est gardé par labyrinthe et par sortie; il est reconstruit
+automatiquement quand l'attribut version du labyrinthe a changé (grille
+modifiée).
+
+Author: Dalker
+Date: 2021.06.15
+"""
+
+import array
+import weakref
+
+import numpy as np
+
+import labyrinthe
+from champ_distances import champ_distances
+
+_CACHE = weakref.WeakKeyDictionary()  # labyrinthe -> {sorties: ArbreSortie}
+
+
+class ArbreSortie():
+    """
+    Arbre des plus courts chemins de toutes les cellules vers des sorties.
+
+    Avec plusieurs sorties, chaque cellule mène à la sortie la plus proche.
+
+    Attributs:
+    - plate: labyrinthe.GrillePlate du labyrinthe
+    - sorties: ensemble des tuples (ligne, colonne) des sorties
+    - version: version du labyrinthe pour laquelle l'arbre a été construit
+    - parent: array.array d'entiers 32 bits indexé par indices plats,
+              indice de la cellule suivante vers la sortie (-1 pour les
+              sorties elles-mêmes, les murs et les cellules d'où aucune
+              sortie n'est accessible)
+    """
+
+    def __init__(self, grid, sorties):
+        """Construire l'arbre à partir du champ de distances aux sorties."""
+        self.plate = plate = labyrinthe.GrillePlate(grid)
+        self.sorties = frozenset(sorties)
+        self.version = grid.version
+        distances = np.pad(champ_distances(grid, self.sorties), 1,
+                           constant_values=-1).ravel()
+        parent = np.full(distances.size, -1, dtype=np.int32)
+        # pour chaque cellule, le premier voisin (droite, bas, gauche, haut)
+        # plus proche de 1 de la sortie
+        indices = np.flatnonzero(distances > 0)
+        for direction in plate.directions:
+            libres = indices[parent[indices] < 0]
+            voisins = libres + direction
+            plus_proches = distances[voisins] == distances[libres] - 1
+            parent[libres[plus_proches]] = voisins[plus_proches]
+        self.parent = array.array("i", parent.tobytes())
+
+    def chemin(self, depart):
+        """
+        Retourner la liste des cellules du plus court chemin vers la sortie.
+
+        Lève ValueError si la sortie est inaccessible depuis depart.
+        """
+        plate, parent = self.plate, self.parent
+        if depart in self.sorties:
+            return [depart]
+        noeud = plate.indice(depart)
+        if parent[noeud] < 0:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        chemin = [depart]
+        while parent[noeud] >= 0:
+            noeud = parent[noeud]
+            chemin.append(plate.cellule(noeud))
+        return chemin
+
+
+def arbre_sortie(grid, sortie=None):
+    """
+    Retourner l'arbre des chemins vers sortie.
+
+    Par défaut, l'arbre mène à la plus proche des sorties de grid. Il est
+    construit une seule fois par labyrinthe et par sortie(s), puis
+    reconstruit seulement si le labyrinthe a été modifié depuis.
+    """
+    sorties = tuple(grid.sorties()) if sortie is None else (sortie,)
+    arbres = _CACHE.setdefault(grid, {})
+    arbre = arbres.get(sorties)
+    if arbre is None or arbre.version != grid.version:
+        arbre = arbres[sorties] = ArbreSortie(grid, sorties)
+    return arbre
+
+
+def astar(grid, distance=None):
+    """
+    Retourner un plus court chemin de grid.start à la sortie la plus proche.
+
+    Même interface que solveur_astar_v3.astar (sans visualisation); le
+    paramètre distance est ignoré. Seule la première requête pour une sortie
+    donnée parcourt le labyrinthe, les suivantes lisent l'arbre en cache.
+    """
+    return iter(arbre_sortie(grid).chemin(grid.start))
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(astar(maze)))
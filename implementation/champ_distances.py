@@ -0,0 +1,106 @@
+"""
+Champ de distances calculé par front d'onde vectorisé (NumPy).
+
+Sur nos grilles, chaque pas coûte 1: un parcours en largeur depuis la sortie
+donne donc d'un coup la distance optimale de chaque cellule à la sortie.
+Plutôt que de traiter les noeuds un par un en Python, on fait avancer tout le
+front d'onde en une seule opération NumPy par niveau: le front est un
+tableau d'indices plats (grille bordée de murs, comme labyrinthe.GrillePlate),
+ses voisins s'obtiennent en lui ajoutant les 4 décalages, et on garde ceux
+qui sont ouverts et pas encore atteints.
+
+Le chemin optimal depuis n'importe quel départ s'obtient ensuite par
+"descente de gradient": depuis le départ, on passe toujours à un voisin dont
+la distance est inférieure de 1, jusqu'à la sortie. Un seul calcul du champ
+suffit donc pour tous les départs.
+
+Author: Dalker
+Date: 2021.06.14
+"""
+
+import numpy as np
+
+import labyrinthe
+
+
+def champ_distances(grid, cibles=None):
+    """
+    Retourner les distances de chaque cellule à la cible la plus proche.
+
+    Entrées:
+    - grid: labyrinthe (tout objet fournissant matrice(), start et out)
+    - cibles: itérable de tuples (ligne, colonne); par défaut les sorties
+              de grid (grid.sorties())
+    Sortie: tableau NumPy int32 de la forme de grid.matrice(), -1 pour les
+            murs et les cellules d'où aucune cible n'est accessible
+    """
+    plate = labyrinthe.GrillePlate(grid)
+    ouvert = np.frombuffer(plate.cases, dtype=bool)
+    distances = np.full(ouvert.size, -1, dtype=np.int32)
+    if cibles is None:
+        cibles = grid.sorties()
+    frontiere = np.unique(np.array([plate.indice(cible) for cible in cibles],
+                                   dtype=np.intp))
+    frontiere = frontiere[ouvert[frontiere]]
+    directions = np.array(plate.directions, dtype=np.intp)
+    distance = 0
+    while frontiere.size:
+        distances[frontiere] = distance
+        distance += 1
+        voisins = (frontiere[:, np.newaxis] + directions).ravel()
+        voisins = voisins[ouvert[voisins] & (distances[voisins] < 0)]
+        frontiere = np.unique(voisins)
+    return np.ascontiguousarray(
+        distances.reshape(plate.n_rows, plate.n_cols)[1:-1, 1:-1])
+
+
+def descente(champ, depart):
+    """
+    Retourner la liste des cellules d'un chemin optimal de depart à la cible.
+
+    Le chemin suit les distances décroissantes du champ, en préférant les
+    voisins dans l'ordre droite, bas, gauche, haut.
+
+    Lève ValueError si aucune cible n'est accessible depuis depart.
+    """
+    n_rows, n_cols = champ.shape
+    row, col = depart
+    distance = champ.item(row, col)
+    if distance < 0:
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    chemin = [depart]
+    while distance > 0:
+        distance -= 1
+        for row2, col2 in ((row, col + 1), (row + 1, col),
+                           (row, col - 1), (row - 1, col)):
+            if (0 <= row2 < n_rows and 0 <= col2 < n_cols
+                    and champ.item(row2, col2) == distance):
+                row, col = row2, col2
+                break
+        chemin.append((row, col))
+    return chemin
+
+
+def chemins(grid, departs, cibles=None):
+    """Générer un chemin optimal vers les cibles pour chaque départ."""
+    champ = champ_distances(grid, cibles)
+    for depart in departs:
+        yield descente(champ, depart)
+
+
+def astar(grid, distance=None):
+    """
+    Retourner un chemin optimal de grid.start à la sortie la plus proche.
+
+    Même interface que solveur_astar_v3.astar (sans visualisation); le
+    paramètre distance est ignoré, le champ de distances étant exact.
+    """
+    return iter(descente(champ_distances(grid), grid.start))
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(champ_distances(maze))
+    print(list(astar(maze)))
@@ -0,0 +1,352 @@
+"""
+État de recherche compact pour A*: cellules vues, fermées et parents.
+
+solveur_astar_v3 gardait son état dans deux dict cout_reel et parent, avec
+des tuples comme clés et comme valeurs: plusieurs centaines d'octets par
+cellule explorée, soit des centaines de Mo pour un Maze de 1000x1000 rooms.
+
+Comme dans solveur_astar_heapq, le coût réel d'une cellule voyage avec elle
+dans les entrées de la marge, avec son parent, et la cellule est fermée
+quand elle sort de la marge pour la première fois: avec une heuristique
+consistante (comme la distance de Manhattan), c'est par un meilleur chemin,
+et les entrées suivantes pour la même cellule sont périmées. L'état n'a
+donc plus de coûts à garder, seulement, indexés par l'indice plat
+ligne * largeur + colonne de la grille (largeur: nombre de colonnes arrondi
+à un multiple de 8):
+- les cellules vues (entrées dans la marge): un bit par cellule
+- les cellules fermées: un bit par cellule
+- le parent de chaque cellule fermée, toujours l'un de ses 4 voisins: on ne
+  garde que la direction qui y mène, sur 2 bits
+
+Soit un demi-octet par cellule de la grille, explorée ou non (ou seulement
+de la fenêtre de lignes gardée par la grille, cf. EtatRecherche). Sur un Maze
+de 1000x1000 rooms (rwd=0.1), le pic de mémoire de solveur_astar_v3 passe
+ainsi de 243Mo (dict d'origine) à 4.4Mo, pour un temps 1.05 à 1.1 fois plus
+long (cf. time_test.comparer_etats).
+
+L'objet se comporte comme un dict des cellules fermées vers leur coût réel
+(in, [], itération, len), ce qui permet de le passer tel quel à
+viewer.AstarView ou visual_pas_a_pas. Le coût est alors retrouvé en
+remontant les parents jusqu'au départ, ce qui ne sert qu'à visualiser.
+
+EtatDict offre la même interface avec un dict des parents et un set des
+cellules vues, pour comparaison (cf. time_test.comparer_etats).
+
+Author: Dalker
+Date: 2021.06.19
+"""
+
+import numpy as np
+
+# directions (ligne, colonne) vers le parent, codées sur 2 bits dans l'ordre
+# droite, bas, gauche, haut
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+# code de chaque direction, selon 2 * écart de lignes + écart de colonnes
+CODES = {2 * drow + dcol: code for code, (drow, dcol) in enumerate(DIRECTIONS)}
+
+
+class EtatRecherche():
+    """
+    Cellules vues et fermées par une recherche A*, avec leurs parents.
+
+    Si la grille ne garde qu'une fenêtre de ses lignes (attribut fenetre,
+    cf. generateur_eller.LabyrintheEller), l'état n'en garde pas plus: ses
+    lignes tournent dans des tableaux de fenetre lignes, et une ligne est
+    oubliée quand la recherche atteint la ligne qui prend sa place. Pour
+    pouvoir encore reconstruire le chemin, on garde alors, sous forme de
+    maillons [cellule, suite], les chemins qui traversent la ligne oubliée
+    et mènent à des cellules vues de la ligne suivante; les branches qui ne
+    mènent plus nulle part sont libérées avec leurs maillons.
+
+    Attributs:
+    - depart: cellule de départ (la seule sans parent)
+    - n_lignes: nombre de lignes gardées (toutes, ou la fenêtre de la grille)
+    - largeur: nombre de bits par ligne (colonnes arrondies à un multiple de
+               8, pour que chaque ligne commence sur un octet)
+    - haut, limite: lignes gardées, de haut (incluse) à limite (exclue)
+    - vus: bytearray, bit à 1 si la cellule est entrée dans la marge
+    - fermes: bytearray, bit à 1 si la cellule est fermée
+    - parents: bytearray, direction du parent sur 2 bits par cellule (valide
+               pour les cellules fermées)
+    - remontees: maillon du parent de chaque cellule vue de la ligne haut
+                 dont le parent (possible) est dans une ligne oubliée
+    - attentes: tuples (maillon, cellule) des maillons dont la suite est la
+                cellule, de la ligne haut: elle sera faite maillon à son tour
+                quand la ligne sera oubliée
+    """
+
+    def __init__(self, grid, depart):
+        """Préparer un état vide pour la grille, où seul depart est vu."""
+        n_rows, n_cols = grid.dimensions()
+        fenetre = getattr(grid, "fenetre", None)
+        self.depart = depart
+        self.n_lignes = n_rows if fenetre is None else min(max(fenetre, 2),
+                                                            n_rows)
+        self.largeur = (n_cols + 7) // 8 * 8
+        self.haut = 0
+        self.limite = self.n_lignes
+        n_cellules = self.n_lignes * self.largeur
+        self.vus = bytearray(n_cellules // 8)
+        self.fermes = bytearray(n_cellules // 8)
+        self.parents = bytearray(n_cellules // 4)
+        self.remontees = {}
+        self.attentes = []
+        self.ouvrir(depart)
+
+    def _indice(self, cell):
+        """Retourner l'indice d'une cellule gardée (IndexError sinon)."""
+        row, col = cell
+        if not self.haut <= row < self.limite:
+            raise IndexError(f"EtatRecherche: la ligne {row} n'est pas "
+                             f"gardée (lignes {self.haut} à "
+                             f"{self.limite - 1})")
+        return row % self.n_lignes * self.largeur + col
+
+    def __contains__(self, cell):
+        """La cellule a-t-elle été fermée (parmi les lignes gardées)?"""
+        if not self.haut <= cell[0] < self.limite:
+            return False
+        indice = self._indice(cell)
+        return self.fermes[indice >> 3] >> (indice & 7) & 1 == 1
+
+    def __getitem__(self, cell):
+        """
+        Retourner le coût réel d'une cellule fermée.
+
+        Le coût n'est pas gardé: on compte les pas jusqu'au départ, en
+        remontant les parents.
+        """
+        if cell not in self:
+            raise KeyError(cell)
+        return len(self.chemin(cell)) - 1
+
+    def __iter__(self):
+        """Parcourir les cellules fermées des lignes gardées."""
+        return self._cellules(np.frombuffer(self.fermes, dtype=np.uint8))
+
+    def __len__(self):
+        """Retourner le nombre de cellules fermées des lignes gardées."""
+        fermes = np.frombuffer(self.fermes, dtype=np.uint8)
+        return int(np.unpackbits(fermes).sum())
+
+    def _cellules(self, bits):
+        """Parcourir les cellules dont le bit est à 1 (tableau d'octets)."""
+        bits = np.unpackbits(bits, bitorder="little")
+        for indice in np.flatnonzero(bits).tolist():
+            rang, col = divmod(indice, self.largeur)
+            yield (self.haut + (rang - self.haut) % self.n_lignes, col)
+
+    def marge(self):
+        """Parcourir les cellules vues mais pas encore fermées."""
+        vus = np.frombuffer(self.vus, dtype=np.uint8)
+        fermes = np.frombuffer(self.fermes, dtype=np.uint8)
+        return self._cellules(vus & ~fermes)
+
+    def ouvrir(self, cell):
+        """
+        Noter que cell entre dans la marge.
+
+        Retourne False (sans rien noter) si cell est déjà fermée: un meilleur
+        chemin y mène déjà.
+        """
+        row, col = cell
+        if row >= self.limite:
+            self._glisser(row)
+        indice = row % self.n_lignes * self.largeur + col
+        bit = 1 << (indice & 7)
+        if self.fermes[indice >> 3] & bit:
+            return False
+        self.vus[indice >> 3] |= bit
+        return True
+
+    def fermer(self, cell, parent):
+        """
+        Fermer cell, atteinte par le meilleur chemin depuis parent.
+
+        Retourne False (sans rien changer) si cell est déjà fermée: l'entrée
+        de la marge qui l'a proposée est périmée. Lève une IndexError si la
+        ligne de cell est déjà oubliée.
+        """
+        row, col = cell
+        if row >= self.limite:
+            self._glisser(row)
+        elif row < self.haut:
+            self._indice(cell)  # IndexError: la recherche a quitté la fenêtre
+        indice = row % self.n_lignes * self.largeur + col
+        fermes = self.fermes
+        octet = fermes[indice >> 3]
+        bit = 1 << (indice & 7)
+        if octet & bit:
+            return False
+        fermes[indice >> 3] = octet | bit
+        if parent is not None:
+            decalage = (indice & 3) << 1
+            code = CODES[2 * (parent[0] - row) + parent[1] - col]
+            parents = self.parents
+            parents[indice >> 2] = (parents[indice >> 2] & ~(3 << decalage)
+                                    | code << decalage)
+        return True
+
+    def parent(self, cell):
+        """Retourner le parent d'une cellule fermée (None pour le départ)."""
+        if cell == self.depart:
+            return None
+        indice = self._indice(cell)
+        code = self.parents[indice >> 2] >> ((indice & 3) << 1) & 3
+        drow, dcol = DIRECTIONS[code]
+        return (cell[0] + drow, cell[1] + dcol)
+
+    def chemin(self, arrivee):
+        """Retourner la liste des cellules de arrivee jusqu'au départ."""
+        attentes = {id(maillon): cell for maillon, cell in self.attentes}
+        chemin = [arrivee]
+        etape = arrivee
+        while etape != self.depart:
+            parent = self.parent(etape)
+            if parent[0] >= self.haut:
+                etape = parent
+                chemin.append(etape)
+                continue
+            # parent dans une ligne oubliée: suivre les maillons
+            maillon = self.remontees[etape]
+            while True:
+                chemin.append(maillon[0])
+                if maillon[1] is None:
+                    break
+                maillon = maillon[1]
+            if maillon[0] == self.depart:
+                break
+            etape = attentes[id(maillon)]  # retour dans les lignes gardées
+            chemin.append(etape)
+        return chemin
+
+    def _glisser(self, row):
+        """Oublier les premières lignes gardées, pour pouvoir garder row."""
+        while row >= self.limite:
+            self._oublier_haut()
+            self.haut += 1
+            self.limite += 1
+
+    def _oublier_haut(self):
+        """
+        Oublier la ligne haut, en gardant ses morceaux de chemins utiles.
+
+        Les maillons de la ligne sont construits à la demande, pour les
+        cellules qui mènent (par leurs parents) aux cellules vues de la
+        ligne suivante, et pour les attentes venant des lignes déjà
+        oubliées.
+        """
+        haut = self.haut
+        maillons = {}  # cellule de la ligne haut -> son maillon
+        attentes = []  # nouvelles attentes, vers la ligne haut + 1
+
+        def maillon(cell):
+            """Retourner le maillon d'une cellule fermée de la ligne haut."""
+            premier = maillons.get(cell)
+            if premier is not None:
+                return premier
+            precedent = None
+            while True:
+                courant = [cell, None]
+                maillons[cell] = courant
+                if precedent is None:
+                    premier = courant
+                else:
+                    precedent[1] = courant
+                if cell == self.depart:
+                    return premier
+                parent = self.parent(cell)
+                if parent[0] < haut:  # déjà oublié: suivre ses maillons
+                    courant[1] = self.remontees[cell]
+                    return premier
+                if parent[0] > haut:  # encore gardé: à suivre plus tard
+                    attentes.append((courant, parent))
+                    return premier
+                suivant = maillons.get(parent)
+                if suivant is not None:
+                    courant[1] = suivant
+                    return premier
+                precedent, cell = courant, parent
+
+        for attente, cell in self.attentes:
+            attente[1] = maillon(cell)
+        # cellules vues de la ligne suivante sous une cellule fermée de la
+        # ligne oubliée, qui est leur parent (ou pourra le devenir)
+        octets = self.largeur // 8
+        debut = haut % self.n_lignes * octets
+        dessous = (haut + 1) % self.n_lignes * octets
+        candidats = (int.from_bytes(self.fermes[debut:debut + octets],
+                                    "little")
+                     & int.from_bytes(self.vus[dessous:dessous + octets],
+                                      "little"))
+        remontees = {}
+        while candidats:
+            bit = candidats & -candidats
+            candidats ^= bit
+            col = bit.bit_length() - 1
+            cell = (haut + 1, col)
+            if cell in self and self.parent(cell)[0] != haut:
+                continue
+            remontees[cell] = maillon((haut, col))
+        self.remontees = remontees
+        self.attentes = attentes
+        self.vus[debut:debut + octets] = bytes(octets)
+        self.fermes[debut:debut + octets] = bytes(octets)
+        self.parents[2 * debut:2 * (debut + octets)] = bytes(2 * octets)
+
+
+class EtatDict(dict):
+    """
+    Même interface qu'EtatRecherche, avec un dict et un set.
+
+    Plus simple mais bien plus gourmand en mémoire (une centaine d'octets
+    par cellule vue).
+
+    Attributs:
+    - depart: cellule de départ (la seule sans parent)
+    - vus: set des cellules entrées dans la marge
+    - (le dict lui-même): cellule fermée -> cellule parente
+    """
+
+    def __init__(self, grid, depart):
+        """Préparer un état vide, où seul depart est vu."""
+        super().__init__()
+        self.depart = depart
+        self.vus = {depart}
+
+    def __getitem__(self, cell):
+        """Retourner le coût réel d'une cellule fermée (cf. EtatRecherche)."""
+        if cell not in self:
+            raise KeyError(cell)
+        return len(self.chemin(cell)) - 1
+
+    def marge(self):
+        """Parcourir les cellules vues mais pas encore fermées."""
+        return (cell for cell in self.vus if cell not in self)
+
+    def ouvrir(self, cell):
+        """Noter que cell entre dans la marge, sauf si elle est fermée."""
+        if cell in self:
+            return False
+        self.vus.add(cell)
+        return True
+
+    def fermer(self, cell, parent):
+        """Fermer cell, atteinte depuis parent, sauf si elle l'est déjà."""
+        if cell in self:
+            return False
+        self[cell] = parent
+        return True
+
+    def parent(self, cell):
+        """Retourner le parent d'une cellule fermée (None pour le départ)."""
+        return self.get(cell)
+
+    def chemin(self, arrivee):
+        """Retourner la liste des cellules de arrivee jusqu'au départ."""
+        chemin = []
+        etape = arrivee
+        while etape is not None:
+            chemin.append(etape)
+            etape = self.get(etape)
+        return chemin
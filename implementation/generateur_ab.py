@@ -5,10 +5,25 @@ par M. Barros
 démarré le 2021.04.06
 """
 
+import array
 import random
+
+import numpy as np
+
 import labyrinthe # abstract class pour communication avec solveurs
 # import generateur_ascii # super classe pour générateurs de labyrinthes (inclut labyrinthe)
 
+# bits du masque des voisins ouverts d'une cellule
+DROITE, BAS, GAUCHE, HAUT = 1, 2, 4, 8
+# pour chaque masque possible, les déplacements (ligne, colonne) ouverts
+# dans l'ordre droite, bas, gauche, haut
+DEPLACEMENTS = tuple(tuple(delta for bit, delta in ((DROITE, (0, 1)),
+                                                    (BAS, (1, 0)),
+                                                    (GAUCHE, (0, -1)),
+                                                    (HAUT, (-1, 0)))
+                           if masque & bit)
+                     for masque in range(16))
+
 
 class Maze(labyrinthe.Labyrinthe):
     """ randomly-generated labyrinth
@@ -25,12 +40,40 @@ class Maze(labyrinthe.Labyrinthe):
 
         NB: matrix uses indices
             in the order row, col, which correspond to [-]y, x!
+
+        la grille 'passable' est un tableau NumPy booléen contigu de forme
+        (rows, cols), soit 1 octet par cellule; il est exposé tel quel (sans
+        copie) aux solveurs et visualiseurs via l'attribut passable ou la
+        méthode matrice()
+        elle ne doit être modifiée que par les méthodes de Maze (carve,
+        destr_murs, set_passable), qui augmentent l'attribut version
+
+        un index de connexité (union-find en int32 sur les indices
+        ligne * cols + col) répond à connectes() en temps quasi constant; il
+        n'est construit qu'au premier appel qui en a besoin: juste après
+        generate, toutes les cases ouvertes forment un arbre couvrant et
+        connectes() n'a besoin d'aucun index
+
+        masque_salles() donne la vue "graphe des rooms" (room_rows x
+        room_cols, un masque de passages ouverts par room), que les solveurs
+        peuvent explorer à la place des cellules tant que
+        graphe_salles_exact() est vrai
             
+        le paramètre method choisit l'algorithme qui génère l'arbre couvrant
+        des rooms (labyrinthe parfait):
+        - "aldous-broder" (par défaut): marche aléatoire simple, tirage
+          uniforme
+        - "wilson": marches aléatoires à boucles effacées, tirage uniforme
+          lui aussi, bien plus rapide
+        - "kruskal": arêtes tirées dans un ordre aléatoire et union-find, le
+          plus rapide, pour les très grands labyrinthes (tirage non uniforme)
+
         un paramètre destruction_murs permet d'enlever des murs après génération
         avec une valeur de 0, aucun mur n'est enlevé après génération
         avec une valeur de 1, tous les murs sont enlevés: seuls restent les murs extérieurs
     """
-    def __init__(self, room_rows, room_cols, destruction_murs = 0):
+    def __init__(self, room_rows, room_cols, destruction_murs = 0,
+                 method="aldous-broder"):
         self.room_rows = room_rows
         self.rows = 2* room_rows + 1
         self.room_cols = room_cols
@@ -38,6 +81,7 @@ class Maze(labyrinthe.Labyrinthe):
         # self.grid = ""
         self.start = (1, 1)
         self.out = (self.rows-2, self.cols-2)
+        self.method = method
         self.fill_passable()
         self.generate()
         self.destruction_murs = destruction_murs # ratio des murs qu'on détruit
@@ -60,12 +104,13 @@ class Maze(labyrinthe.Labyrinthe):
             
         
         """
-        self.passable = []
-        for _ in range(self.rows):
-            self.passable += [[False] * (self.cols)]
-            self.passable += [[False, True] * (self.room_cols) + [False]]
-        self.passable += [[False] * (self.cols)]
-        # return True
+        self.passable = np.zeros((self.rows, self.cols), dtype=bool)
+        self.passable[1::2, 1::2] = True  # rooms
+        self._masque = None  # masque des voisins, calculé à la demande
+        self._parents = None  # index de connexité, calculé à la demande
+        self._arbre = False  # True si les cases ouvertes forment un arbre
+        self._salles = None  # masque des rooms (version, masque), à la demande
+        self.version += 1
             
 
     def carve(self, cell, direction):
@@ -74,71 +119,354 @@ class Maze(labyrinthe.Labyrinthe):
         col = cell[1]*2+1
         # if 0 <= row+direction[0] < self.rows and 0 <= col+direction[1] < self.cols:
         if direction == (-1, 0):  # up
-            self.passable[row-1][col] = True
+            self.passable[row-1, col] = True
         elif direction == (1, 0):  # down
-            self.passable[row+1][col] = True
+            self.passable[row+1, col] = True
         elif direction == (0, -1):  # left
-            self.passable[row][col-1] = True
+            self.passable[row, col-1] = True
         elif direction == (0, 1):  # right
-            self.passable[row][col+1] = True
+            self.passable[row, col+1] = True
+        self._masque = None
+        self._parents = None
+        self._arbre = False
+        self.version += 1
         # return True
 
     def generate(self):
+        """ génère l'arbre couvrant des rooms avec l'algorithme self.method
+        """
+        generateurs = {"aldous-broder": self.generate_aldous_broder,
+                       "wilson": self.generate_wilson,
+                       "kruskal": self.generate_kruskal}
+        if self.method not in generateurs:
+            raise ValueError(f"Maze: méthode de génération inconnue: "
+                             f"{self.method}")
+        generateurs[self.method]()
+        # arbre couvrant: toutes les cases ouvertes forment une seule
+        # composante, l'index de connexité est inutile jusqu'au prochain
+        # changement de la grille
+        self._arbre = True
+
+    def generate_aldous_broder(self):
         """ Aldous-Broder algorithm:
         random walk until all cells are added
         any time a non-visited cell is reach, a wall is broken on the way
         """
-        directions = {(-1, 0), (1, 0), (0, -1), (0, 1)}
-        visited = set()  # visited cells
+        directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
         # initial node is random
         cell = (random.randrange(self.room_rows), random.randrange(self.room_cols))
+        visited = {cell}  # visited cells
         while len(visited) < self.room_rows * self.room_cols:
-            visited.add(cell)
             # choose a direction for random walk from current
             next_exists = False
             while not next_exists:
-                direction = random.sample(directions, 1)[0]
+                direction = random.choice(directions)
                 nextcell = (cell[0]+direction[0], cell[1]+direction[1])
                 next_exists = (0 <= nextcell[0] < self.room_rows
                                and 0 <= nextcell[1] < self.room_cols)
             # if next is new, carve a wall to get there
             if nextcell not in visited:
                 self.carve(cell, direction)
+                visited.add(nextcell)
             # walk
             cell = nextcell
         # return True
 
+    def generate_wilson(self):
+        """ algorithme de Wilson: en partant d'un arbre réduit à une room
+            tirée au hasard, on lance depuis chaque room hors de l'arbre une
+            marche aléatoire jusqu'à toucher l'arbre, en retenant pour chaque
+            room la dernière direction prise en la quittant; suivre ces
+            directions depuis le départ donne la marche sans ses boucles, qui
+            est ajoutée à l'arbre
+
+            les rooms sont des indices plats ligne * room_cols + colonne, et
+            les connecteurs à ouvrir sont écrits d'un coup dans 'passable'
+        """
+        room_rows, room_cols = self.room_rows, self.room_cols
+        n_rooms = room_rows * room_cols
+        directions = ((0, 1), (1, 0), (0, -1), (-1, 0))
+        dans_arbre = bytearray(n_rooms)
+        sortie = bytearray(n_rooms)  # dernière direction prise par room
+        dans_arbre[random.randrange(n_rooms)] = 1
+        departs = list(range(n_rooms))
+        random.shuffle(departs)
+        getrandbits = random.getrandbits
+        ouvertures = []  # indices plats (dans 'passable') des connecteurs
+        for depart in departs:
+            if dans_arbre[depart]:
+                continue
+            # marche aléatoire jusqu'à l'arbre
+            row, col = divmod(depart, room_cols)
+            room = depart
+            while not dans_arbre[room]:
+                code = getrandbits(2)
+                drow, dcol = directions[code]
+                if 0 <= row + drow < room_rows and 0 <= col + dcol < room_cols:
+                    sortie[room] = code
+                    row += drow
+                    col += dcol
+                    room = row * room_cols + col
+            # ajout à l'arbre de la marche sans ses boucles
+            row, col = divmod(depart, room_cols)
+            room = depart
+            while not dans_arbre[room]:
+                dans_arbre[room] = 1
+                drow, dcol = directions[sortie[room]]
+                ouvertures.append((2 * row + 1 + drow) * self.cols
+                                  + 2 * col + 1 + dcol)
+                row += drow
+                col += dcol
+                room = row * room_cols + col
+        self.passable.reshape(-1)[ouvertures] = True
+        self._masque = None
+        self.version += 1
+
+    def generate_kruskal(self):
+        """ algorithme de Kruskal randomisé: on parcourt toutes les arêtes
+            entre rooms voisines dans un ordre aléatoire et on ouvre celles
+            qui relient deux composantes encore séparées
+
+            - une arête est codée 2 * room + 0 (vers la droite) ou
+              2 * room + 1 (vers le bas), room étant l'indice plat
+              ligne * room_cols + colonne
+            - leur mélange est fait d'un coup par NumPy, avec un générateur
+              initialisé depuis le module random (random.seed reste valable)
+            - arêtes, parents et arêtes acceptées sont des entiers 32 bits,
+              pour tenir en mémoire jusqu'à 4000x4000 rooms et plus
+            - les composantes sont un union-find en array.array (parents) et
+              bytearray (rangs): union par rang, compression de chemins par
+              moitiés
+            - les connecteurs ouverts sont écrits d'un coup dans 'passable'
+        """
+        room_rows, room_cols = self.room_rows, self.room_cols
+        n_rooms = room_rows * room_cols
+        rooms = np.arange(n_rooms, dtype=np.int32).reshape(room_rows,
+                                                            room_cols)
+        aretes = np.concatenate((2 * rooms[:, :-1].ravel(),
+                                 2 * rooms[:-1, :].ravel() + 1))
+        np.random.default_rng(random.getrandbits(64)).shuffle(aretes)
+        parents = array.array("i", range(n_rooms))
+        rangs = bytearray(n_rooms)
+        acceptees = array.array("i")
+        a_accepter = n_rooms - 1
+        for debut in range(0, len(aretes), 1 << 20):
+            for arete in aretes[debut:debut + (1 << 20)].tolist():
+                racine1 = arete >> 1
+                racine2 = racine1 + (room_cols if arete & 1 else 1)
+                while parents[racine1] != racine1:
+                    parents[racine1] = racine1 = parents[parents[racine1]]
+                while parents[racine2] != racine2:
+                    parents[racine2] = racine2 = parents[parents[racine2]]
+                if racine1 == racine2:
+                    continue  # les deux rooms sont déjà reliées
+                if rangs[racine1] < rangs[racine2]:
+                    racine1, racine2 = racine2, racine1
+                parents[racine2] = racine1
+                if rangs[racine1] == rangs[racine2]:
+                    rangs[racine1] += 1
+                acceptees.append(arete)
+            if len(acceptees) == a_accepter:
+                break  # arbre couvrant complet
+        acceptees = np.frombuffer(acceptees, dtype=np.int32).astype(np.int64)
+        row, col = np.divmod(acceptees >> 1, room_cols)
+        vers_bas = acceptees & 1
+        self.passable.reshape(-1)[(2 * row + 1 + vers_bas) * self.cols
+                                  + 2 * col + 2 - vers_bas] = True
+        self._masque = None
+        self.version += 1
+
     def destr_murs(self):
-        wall_cells = []
-        for row in range (1, self.rows-1):
-            for col in range (1, self.cols-1):
-                if not self.passable[row][col]:
-                    wall_cells += [(row, col)]
+        """ ouvre la proportion destruction_murs des murs intérieurs (le mur
+            extérieur reste intact), tirés sans remise en une seule fois par
+            NumPy, avec un générateur initialisé depuis le module random
+            (random.seed reste valable)
+        """
+        if self.destruction_murs <= 0:
+            return  # rien à détruire: inutile de lister les murs
+        murs = np.zeros_like(self.passable)
+        murs[1:-1, 1:-1] = ~self.passable[1:-1, 1:-1]
+        wall_cells = np.flatnonzero(murs)  # indices plats des murs intérieurs
         walls_abs_destr = int(self.destruction_murs * len(wall_cells))
         if walls_abs_destr>0:
-            for i in range(walls_abs_destr):
-                sentence = random.randrange(len(wall_cells))
-                self.passable[wall_cells[sentence][0]][wall_cells[sentence][1]] = True
-                wall_cells.pop(sentence)
-        
+            rng = np.random.default_rng(random.getrandbits(64))
+            detruits = rng.choice(wall_cells, walls_abs_destr, replace=False)
+            self.passable.reshape(-1)[detruits] = True
+            self._masque = None
+            self.version += 1
+            # l'index de connexité sera recalculé au premier connectes()
+            self._parents = None
+            self._arbre = False
 
     def __str__(self):
         """ sort un string qui représente grossièrement notre labyrinthe
             avec des "#" pour les obstacles (murs) et des " " pour les cases ouvertes
         """
-        grid = ""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                grid += " " if self.passable[row][col] else "#"
-            if row < self.rows-1:
-                grid += "\n"
-        return grid
+        chars = np.full((self.rows, self.cols + 1), ord("\n"), dtype=np.uint8)
+        chars[:, :-1] = np.where(self.passable, ord(" "), ord("#"))
+        return chars.tobytes().decode("ascii")[:-1]
     
     def __contains__(self, cell):
         """ renvoie True si l'emplacement défini par les coordonnées "cell"
             est vide (donc passable), False sinon (mur)
         """
-        return self.passable[cell[0]][cell[1]]
+        return self.passable.item(cell)
+
+    def neighbours(self, cell):
+        """ renvoie la liste des voisins ouverts de "cell", lue dans un masque
+            de bits (droite, bas, gauche, haut) calculé d'un coup pour toute
+            la grille et recalculé seulement si la grille a changé
+        """
+        if self._masque is None:
+            self.calculer_masque()
+        row, col = cell
+        return [(row + drow, col + dcol)
+                for drow, dcol in DEPLACEMENTS[self._masque.item(row, col)]]
+
+    def calculer_masque(self):
+        """ calcule pour chaque cellule le masque de bits de ses voisins
+            ouverts (0 pour un mur)
+        """
+        ouvert = self.passable
+        masque = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        horizontal = ouvert[:, :-1] & ouvert[:, 1:]
+        vertical = ouvert[:-1, :] & ouvert[1:, :]
+        masque[:, :-1] |= horizontal * np.uint8(DROITE)
+        masque[:, 1:] |= horizontal * np.uint8(GAUCHE)
+        masque[:-1, :] |= vertical * np.uint8(BAS)
+        masque[1:, :] |= vertical * np.uint8(HAUT)
+        self._masque = masque
+
+    def masque_salles(self):
+        """ renvoie un tableau (room_rows, room_cols) donnant pour chaque room
+            le masque de bits (droite, bas, gauche, haut) des passages
+            ouverts vers ses rooms voisines; les murs de la room sont le
+            complément 15 ^ masque
+            calculé d'un coup et gardé tant que la version n'a pas changé
+        """
+        if self._salles is not None and self._salles[0] == self.version:
+            return self._salles[1]
+        ouvert = self.passable
+        masque = np.zeros((self.room_rows, self.room_cols), dtype=np.uint8)
+        masque |= ouvert[1::2, 2::2] * np.uint8(DROITE)
+        masque |= ouvert[2::2, 1::2] * np.uint8(BAS)
+        masque |= ouvert[1::2, 0:-1:2] * np.uint8(GAUCHE)
+        masque |= ouvert[0:-1:2, 1::2] * np.uint8(HAUT)
+        self._salles = (self.version, masque)
+        return masque
+
+    def graphe_salles_exact(self):
+        """ renvoie True si le graphe des rooms décrit exactement la grille:
+            rooms toutes ouvertes, piliers (lignes et colonnes paires) et
+            bord extérieur fermés; destr_murs ou set_passable peuvent ouvrir
+            des piliers, qui relient alors des passages hors du graphe
+        """
+        ouvert = self.passable
+        return bool(ouvert[1::2, 1::2].all()
+                    and not ouvert[::2, ::2].any()
+                    and not ouvert[0].any() and not ouvert[-1].any()
+                    and not ouvert[:, 0].any() and not ouvert[:, -1].any())
+
+    def set_passable(self, cell, value=True):
+        """ ouvre (value=True) ou ferme (value=False) la cellule "cell" après
+            génération; si le masque des voisins est déjà calculé, seuls les
+            bits de la cellule et de ses 4 voisins sont mis à jour
+        """
+        row, col = cell
+        self.passable[row, col] = value
+        self.version += 1
+        self._arbre = False
+        if not value:
+            self._parents = None  # une fermeture peut couper une composante
+        elif self._parents is not None:
+            for drow, dcol in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                voisin = (row + drow, col + dcol)
+                if (0 <= voisin[0] < self.rows and 0 <= voisin[1] < self.cols
+                        and self.passable.item(voisin)):
+                    self.unir(cell, voisin)
+        if self._masque is None:
+            return
+        for bit, oppose, (drow, dcol) in ((DROITE, GAUCHE, (0, 1)),
+                                          (BAS, HAUT, (1, 0)),
+                                          (GAUCHE, DROITE, (0, -1)),
+                                          (HAUT, BAS, (-1, 0))):
+            voisin = (row + drow, col + dcol)
+            if not (0 <= voisin[0] < self.rows and 0 <= voisin[1] < self.cols):
+                continue
+            if value and self.passable.item(voisin):
+                self._masque[row, col] |= bit
+                self._masque[voisin] |= oppose
+            else:
+                self._masque[row, col] &= 15 ^ bit
+                self._masque[voisin] &= 15 ^ oppose
+
+    def calculer_composantes(self):
+        """ reconstruit l'index de connexité de toute la grille, vectorisé:
+            chaque racine est rattachée à la plus petite racine voisine, puis
+            chaque case pointe directement sur sa racine (compression de
+            chemins), jusqu'à ce que les cases voisines ouvertes aient toutes
+            la même racine
+        """
+        ouvert = self.passable
+        indices = np.arange(self.rows * self.cols,
+                            dtype=np.int32).reshape(self.rows, self.cols)
+        horizontal = ouvert[:, :-1] & ouvert[:, 1:]
+        vertical = ouvert[:-1, :] & ouvert[1:, :]
+        cases1 = np.concatenate((indices[:, :-1][horizontal],
+                                 indices[:-1, :][vertical]))
+        cases2 = np.concatenate((indices[:, 1:][horizontal],
+                                 indices[1:, :][vertical]))
+        parents = indices.ravel()
+        while True:
+            racines1, racines2 = parents[cases1], parents[cases2]
+            differentes = racines1 != racines2
+            if not differentes.any():
+                break
+            racines1, racines2 = racines1[differentes], racines2[differentes]
+            np.minimum.at(parents, np.maximum(racines1, racines2),
+                          np.minimum(racines1, racines2))
+            while True:
+                suivants = parents[parents]
+                if np.array_equal(suivants, parents):
+                    break
+                parents = suivants
+        self._parents = parents
+
+    def racine(self, indice):
+        """ renvoie la racine de l'indice dans l'index de connexité, en
+            raccourcissant le chemin parcouru (path halving)
+        """
+        parents = self._parents
+        while parents[indice] != indice:
+            parents[indice] = parents[parents[indice]]
+            indice = parents[indice]
+        return indice
+
+    def unir(self, cell1, cell2):
+        """ réunit les composantes des cases cell1 et cell2 dans l'index
+        """
+        racine1 = self.racine(cell1[0] * self.cols + cell1[1])
+        racine2 = self.racine(cell2[0] * self.cols + cell2[1])
+        if racine1 != racine2:
+            self._parents[max(racine1, racine2)] = min(racine1, racine2)
+
+    def connectes(self, cell1, cell2):
+        """ renvoie True si les cases cell1 et cell2 sont ouvertes et reliées
+            par un chemin, en consultant l'index de connexité
+        """
+        if not (self.passable.item(cell1) and self.passable.item(cell2)):
+            return False
+        if self._arbre:
+            return True  # arbre couvrant: tout est relié
+        if self._parents is None:
+            self.calculer_composantes()
+        return (self.racine(cell1[0] * self.cols + cell1[1])
+                == self.racine(cell2[0] * self.cols + cell2[1]))
+
+    def matrice(self):
+        """ renvoie la grille 'passable' elle-même (tableau NumPy, sans copie)
+        """
+        return self.passable
 
 
 if __name__ == "__main__":
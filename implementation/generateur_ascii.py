@@ -154,7 +154,8 @@ class LabyrintheAscii(labyrinthe.Labyrinthe):
         Initialiser labyrinthe.
 
         La carte doit contenir # pour les "murs", I pour l'entrée et O pour la
-        sortie.
+        sortie. Elle peut contenir plusieurs O: out est alors le tuple des
+        sorties, dans l'ordre de lecture de la carte.
         """
         lignes = asciimap.strip().split("\n")
         assert all(len(ligne) == len(lignes[0]) for ligne in lignes),\
@@ -163,18 +164,27 @@ class LabyrintheAscii(labyrinthe.Labyrinthe):
         self._n_rows = len(lignes)
         self._n_cols = len(lignes[0])
         self.start = None
-        self.out = None
+        sorties = []
         for row, col in it.product(range(self._n_rows), range(self._n_cols)):
             if self._matrice[row][col] == "I":
                 self.start = (row, col)
                 self._matrice[row][col] == " "
             elif self._matrice[row][col] == "O":
-                self.out = (row, col)
+                sorties.append((row, col))
                 self._matrice[row][col] == " "
-        assert (self.start is not None and self.out is not None),\
+        assert (self.start is not None and sorties),\
             "Un labyrinthe doit avoir un départ et une sortie"
+        self.out = sorties[0] if len(sorties) == 1 else tuple(sorties)
         self._ascii = "\n".join(["".join([char for char in ligne])
                                  for ligne in self._matrice])
+        # voisins accessibles précalculés pour chaque cellule
+        self._voisins = [[[(row + drow, col + dcol)
+                           for drow, dcol in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                           if 0 <= row + drow < self._n_rows
+                           and 0 <= col + dcol < self._n_cols
+                           and (row + drow, col + dcol) in self]
+                          for col in range(self._n_cols)]
+                         for row in range(self._n_rows)]
 
     def __str__(self):
         return self._ascii
@@ -183,6 +193,10 @@ class LabyrintheAscii(labyrinthe.Labyrinthe):
         row, col = cell
         return False if self._matrice[row][col] == "#" else True
 
+    def neighbours(self, cell):
+        row, col = cell
+        return self._voisins[row][col]
+
 
 MAZE10 = LabyrintheAscii(GRILLE10x10)
 MAZE20 = LabyrintheAscii(GRILLE20x20)
@@ -0,0 +1,204 @@
+"""
+Génération de labyrinthes ligne par ligne (algorithme d'Eller).
+
+generateur_ab.Maze construit toute la grille 'passable' avant de la rendre.
+L'algorithme d'Eller produit un labyrinthe parfait (même disposition rooms /
+connecteurs / piliers que Maze) une ligne de rooms à la fois, en ne gardant
+que l'ensemble (la composante connexe, vue depuis les lignes déjà produites)
+de chaque room de la ligne courante:
+- on relie au hasard des rooms voisines de la ligne qui ne sont pas encore
+  dans le même ensemble (toutes sur la dernière ligne)
+- chaque ensemble ouvre au moins un passage vers la ligne suivante, les
+  rooms non atteintes par ces passages commençant un nouvel ensemble
+
+La mémoire utilisée est donc proportionnelle à la largeur, quelle que soit
+la hauteur: lignes_eller peut même produire un labyrinthe sans fin.
+
+LabyrintheEller enveloppe ce flot de lignes dans un labyrinthe.Labyrinthe,
+en gardant les lignes déjà lues (toutes, ou seulement une fenêtre glissante
+des dernières) pour les solveurs qui passent par neighbours et __contains__.
+
+Author: Dalker
+Date: 2021.06.20
+"""
+
+import collections
+import itertools
+import random
+
+import numpy as np
+
+import labyrinthe
+
+
+def lignes_eller(room_rows, room_cols, seed=None):
+    """
+    Produire une à une les lignes de cellules d'un labyrinthe parfait.
+
+    Entrées:
+    - room_rows: nombre de lignes de rooms, ou None pour ne jamais s'arrêter
+    - room_cols: nombre de colonnes de rooms
+    - seed: graine du générateur aléatoire (random.Random), pour pouvoir
+            reproduire un labyrinthe
+
+    Sortie: générateur de tableaux NumPy booléens de 2 * room_cols + 1
+            cellules (True = passage), soit 2 * room_rows + 1 lignes en tout
+    """
+    rng = random.Random(seed)
+    cols = 2 * room_cols + 1
+    ensembles = list(range(room_cols))  # ensemble de chaque room
+    membres = {colonne: [colonne] for colonne in range(room_cols)}
+    prochain = room_cols  # prochain numéro d'ensemble libre
+    yield np.zeros(cols, dtype=bool)  # mur du haut
+    lignes = range(room_rows) if room_rows is not None else itertools.count()
+    for row in lignes:
+        derniere = room_rows is not None and row == room_rows - 1
+        # ligne des rooms et des passages horizontaux
+        ligne = np.zeros(cols, dtype=bool)
+        ligne[1::2] = True
+        for col in range(room_cols - 1):
+            gauche, droite = ensembles[col], ensembles[col + 1]
+            if gauche == droite or not (derniere or rng.random() < 0.5):
+                continue
+            ligne[2 * col + 2] = True
+            # fusionner le plus petit ensemble dans le plus grand
+            if len(membres[gauche]) < len(membres[droite]):
+                gauche, droite = droite, gauche
+            for colonne in membres[droite]:
+                ensembles[colonne] = gauche
+            membres[gauche].extend(membres.pop(droite))
+        yield ligne
+        if derniere:
+            break
+        # ligne des passages verticaux: au moins un par ensemble
+        dessous = np.zeros(cols, dtype=bool)
+        suivants = [None] * room_cols
+        for ensemble, colonnes in membres.items():
+            ouvertes = [colonne for colonne in colonnes if rng.random() < 0.5]
+            if not ouvertes:
+                ouvertes = [rng.choice(colonnes)]
+            for colonne in ouvertes:
+                dessous[2 * colonne + 1] = True
+                suivants[colonne] = ensemble
+        yield dessous
+        # rooms de la ligne suivante: nouvel ensemble si pas de passage
+        membres = {}
+        for colonne in range(room_cols):
+            if suivants[colonne] is None:
+                suivants[colonne] = prochain
+                prochain += 1
+            membres.setdefault(suivants[colonne], []).append(colonne)
+        ensembles = suivants
+    yield np.zeros(cols, dtype=bool)  # mur du bas
+
+
+class LabyrintheEller(labyrinthe.Labyrinthe):
+    """
+    Labyrinthe parfait généré ligne par ligne à la demande.
+
+    Les lignes sont lues dans le flot de lignes_eller au fur et à mesure que
+    les solveurs consultent des cellules plus bas. Avec fenetre=None, toutes
+    les lignes lues sont gardées; sinon, seules les fenetre dernières le
+    sont, et consulter une ligne déjà oubliée lève une IndexError.
+
+    Le labyrinthe étant parfait, deux rooms sont toujours reliées:
+    connectes et dimensions() répondent sans lire le flot.
+
+    Avec une fenêtre, solveur_astar_v3 ne garde lui aussi que fenetre
+    lignes de son état de recherche (cf. etat_recherche.EtatRecherche) et
+    abandonne les noeuds de sa marge restés dans des lignes oubliées: il
+    trouve le chemin tant que celui-ci ne remonte pas de plus de fenetre
+    lignes derrière le front de la recherche (par exemple, fenetre=100
+    suffit sur 500x20 rooms; sinon, IndexError). Les autres solveurs qui
+    n'explorent la grille que par neighbours et __contains__
+    (solveur_astar_naif, solveur_astar_heapq, solveur_astar_v3_bis...)
+    lèvent une IndexError dès que leur marge les ramène à une ligne
+    oubliée, ce qui arrive vite: mieux vaut leur donner fenetre=None.
+    Ceux qui lisent toute la grille d'un coup par matrice()
+    (solveur_astar_v4, solveur_jps, solveur_salles, cache_sortie,
+    champ_distances...) demandent fenetre=None: avec une fenêtre,
+    matrice() lève une ValueError.
+
+    Attributs:
+    - room_rows, room_cols, rows, cols: dimensions comme pour Maze
+    - start, out: première et dernière room
+    - fenetre: nombre de lignes gardées, ou None pour toutes
+    - lignes: deque des lignes de cellules gardées
+    - lues: nombre de lignes lues dans le flot
+    """
+
+    def __init__(self, room_rows, room_cols, seed=None, fenetre=None):
+        """Préparer le flot de lignes, sans encore en lire."""
+        self.room_rows = room_rows
+        self.room_cols = room_cols
+        self.rows = 2 * room_rows + 1
+        self.cols = 2 * room_cols + 1
+        self.start = (1, 1)
+        self.out = (self.rows - 2, self.cols - 2)
+        self._flot = lignes_eller(room_rows, room_cols, seed)
+        self.fenetre = fenetre
+        self.lignes = collections.deque(maxlen=fenetre)
+        self.lues = 0
+
+    def ligne(self, row):
+        """Retourner la ligne de cellules row, en lisant le flot si besoin."""
+        while self.lues <= row:
+            self.lignes.append(next(self._flot))
+            self.lues += 1
+        premiere = self.lues - len(self.lignes)
+        if row < premiere:
+            raise IndexError(f"LabyrintheEller: la ligne {row} est sortie "
+                             f"de la fenêtre (lignes {premiere} et plus)")
+        return self.lignes[row - premiere]
+
+    def __contains__(self, cell):
+        """La cellule est-elle dans le labyrinthe et traversable?"""
+        row, col = cell
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
+        return bool(self.ligne(row)[col])
+
+    def __str__(self):
+        """Retourner les lignes gardées sous forme ascii."""
+        return "\n".join("".join(" " if case else "#" for case in ligne)
+                         for ligne in self.lignes)
+
+    def connectes(self, cell1, cell2):
+        """
+        Dans un labyrinthe parfait, toutes les cellules ouvertes le sont.
+
+        Les rooms sont toujours ouvertes, les piliers et le bord toujours
+        fermés: seul un connecteur demande de lire sa ligne. Pour une
+        requête entre rooms (start et out), on ne lit donc rien, ce qui
+        laisse la fenêtre sur les premières lignes pour la recherche.
+        """
+        for row, col in (cell1, cell2):
+            if not (0 < row < self.rows - 1 and 0 < col < self.cols - 1):
+                return False
+            if row % 2 == 0 and col % 2 == 0:
+                return False  # pilier
+            if (row % 2 == 0 or col % 2 == 0) and (row, col) not in self:
+                return False  # connecteur fermé
+        return True
+
+    def dimensions(self):
+        """Retourner les dimensions de la grille, sans lire le flot."""
+        return (self.rows, self.cols)
+
+    def matrice(self):
+        """Lire tout le labyrinthe et le retourner en tableau NumPy."""
+        if self.lignes.maxlen is not None:
+            raise ValueError("LabyrintheEller: matrice() demande tout le "
+                             "labyrinthe, impossible avec une fenêtre")
+        self.ligne(self.rows - 1)
+        return np.array(self.lignes)
+
+
+if __name__ == "__main__":
+    # test minimal: un labyrinthe de 10x10 rooms, puis sa solution
+    for ligne in lignes_eller(10, 10, seed=1):
+        print("".join(" " if case else "#" for case in ligne))
+    from solveur_astar_v3 import astar
+    print(list(astar(LabyrintheEller(10, 10, seed=1))))
+    # avec une fenêtre bien plus petite que le labyrinthe
+    print(len(list(astar(LabyrintheEller(500, 20, seed=1, fenetre=100)))))
@@ -0,0 +1,181 @@
+"""
+Heuristique ALT (A*, Landmarks, Triangle inequality).
+
+Dans un labyrinthe parfait, le vrai chemin entre deux cellules est souvent
+bien plus long que leur distance de Manhattan: l'heuristique ne guide alors
+presque plus A*, qui se comporte comme Dijkstra. L'heuristique ALT utilise
+quelques cellules "repères" L dont on connaît la distance réelle d(L, n) à
+toutes les cellules n (un parcours en largeur par repère). Par l'inégalité
+triangulaire, pour tout repère L:
+
+    d(n, but) >= |d(L, n) - d(L, but)|
+
+Le maximum de ces bornes sur tous les repères (et de la distance de
+Manhattan) est donc une heuristique admissible et cohérente, en général bien
+plus proche de la vraie distance.
+
+Les repères sont choisis "au plus loin" les uns des autres: le premier est la
+cellule la plus éloignée du départ, chaque suivant la cellule la plus
+éloignée des repères déjà choisis. Les tables de distances sont calculées
+une fois par labyrinthe et peuvent être sauvées dans un fichier .npz
+(numpy.savez) à côté du labyrinthe puis rechargées.
+
+Author: Dalker
+Date: 2021.06.13
+"""
+
+import array
+import weakref
+
+import numpy as np
+
+import labyrinthe
+
+_CACHE = weakref.WeakKeyDictionary()  # labyrinthe -> HeuristiqueALT
+
+
+def distances_largeur(plate, source):
+    """
+    Retourner les distances de source à toutes les cellules d'une grille.
+
+    Entrées: plate est une labyrinthe.GrillePlate, source un indice plat.
+    Sortie: tableau NumPy int32 indexé par indices plats, -1 pour les
+            cellules fermées ou inaccessibles depuis source
+    """
+    cases, directions = plate.cases, plate.directions
+    distances = array.array("i", [-1]) * (plate.n_rows * plate.n_cols)
+    distances[source] = 0
+    frontiere = [source]
+    distance = 0
+    while frontiere:
+        distance += 1
+        suivante = []
+        for noeud in frontiere:
+            for direction in directions:
+                voisin = noeud + direction
+                if cases[voisin] and distances[voisin] < 0:
+                    distances[voisin] = distance
+                    suivante.append(voisin)
+        frontiere = suivante
+    return np.frombuffer(distances, dtype=np.int32)
+
+
+class HeuristiqueALT():
+    """
+    Tables de distances aux repères d'un labyrinthe.
+
+    Attributs:
+    - plate: labyrinthe.GrillePlate du labyrinthe
+    - version: version du labyrinthe pour laquelle les tables sont valables
+    - reperes: tableau NumPy des indices plats des repères
+    - distances: tableau NumPy int32 de forme (repères, cellules), distance
+                 de chaque repère à chaque cellule (-1 si inaccessible)
+    """
+
+    def __init__(self, grid, n_reperes=8, distances=None):
+        """
+        Choisir n_reperes repères et calculer leurs tables de distances.
+
+        Si distances est fourni (tables déjà calculées, par exemple chargées
+        d'un fichier), les repères ne sont pas recalculés.
+        """
+        self.plate = labyrinthe.GrillePlate(grid)
+        self.version = grid.version
+        if distances is not None:
+            self.distances = distances
+            self.reperes = np.argmax(distances == 0, axis=1)
+        else:
+            self.choisir_reperes(grid.start, n_reperes)
+        self._but = None  # dernier but demandé
+        self._bornes = None  # heuristique de chaque cellule vers ce but
+
+    def choisir_reperes(self, depart, n_reperes):
+        """Choisir les repères au plus loin les uns des autres."""
+        plate = self.plate
+        # les cellules inaccessibles depuis le départ ne comptent pas
+        eloignement = distances_largeur(plate, plate.indice(depart))
+        reperes = []
+        tables = []
+        for _ in range(n_reperes):
+            repere = int(np.argmax(eloignement))
+            if eloignement[repere] <= 0 and reperes:
+                break  # plus aucune cellule distincte des repères
+            reperes.append(repere)
+            tables.append(distances_largeur(plate, repere))
+            if len(tables) == 1:
+                eloignement = tables[0]
+            else:
+                eloignement = np.minimum(eloignement, tables[-1])
+        self.reperes = np.array(reperes)
+        self.distances = np.stack(tables)
+
+    def distance(self, node, goal):
+        """
+        Retourner la borne inférieure ALT de la distance de node à goal.
+
+        Même signature que solveur_astar_v3.manhattan_distance, pour être
+        passée en paramètre distance de astar. Les bornes de toutes les
+        cellules vers goal sont calculées d'un coup au premier appel pour
+        ce but, puis lues directement.
+        """
+        if goal != self._but:
+            self._bornes = self.bornes(goal)
+            self._but = goal
+        return self._bornes[self.plate.indice(node)]
+
+    def bornes(self, goal):
+        """Retourner les bornes ALT de chaque cellule vers goal, dans un
+        array.array d'entiers 32 bits indexé par indices plats."""
+        plate = self.plate
+        distances = self.distances
+        but = distances[:, plate.indice(goal)][:, np.newaxis]
+        valides = (distances >= 0) & (but >= 0)
+        bornes = np.where(valides, np.abs(distances - but), 0).max(axis=0)
+        # la distance de Manhattan reste une borne valable
+        rows, cols = np.divmod(np.arange(plate.n_rows * plate.n_cols),
+                               plate.n_cols)
+        manhattan = np.abs(rows - 1 - goal[0]) + np.abs(cols - 1 - goal[1])
+        return array.array("i", np.maximum(bornes, manhattan)
+                           .astype(np.int32).tobytes())
+
+    def sauver(self, fichier):
+        """Sauver les tables de distances dans un fichier .npz."""
+        np.savez(fichier, distances=self.distances,
+                 forme=np.array((self.plate.n_rows, self.plate.n_cols)))
+
+    @classmethod
+    def charger(cls, grid, fichier):
+        """
+        Créer l'heuristique de grid à partir d'un fichier sauvé par sauver().
+
+        Lève ValueError si les tables ne correspondent pas à la taille de
+        grid.
+        """
+        with np.load(fichier) as donnees:
+            heuristique = cls(grid, distances=donnees["distances"])
+            forme = tuple(donnees["forme"].tolist())
+        if forme != (heuristique.plate.n_rows, heuristique.plate.n_cols):
+            raise ValueError("ALT: les tables ne correspondent pas à la"
+                             " taille du labyrinthe")
+        return heuristique
+
+
+def heuristique_alt(grid, n_reperes=8):
+    """
+    Retourner l'heuristique ALT de grid, calculée une seule fois.
+
+    Les tables sont recalculées si le labyrinthe a été modifié depuis.
+    """
+    heuristique = _CACHE.get(grid)
+    if heuristique is None or heuristique.version != grid.version:
+        heuristique = _CACHE[grid] = HeuristiqueALT(grid, n_reperes)
+    return heuristique
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE30 as maze
+    from solveur_astar_v3 import astar
+    alt = heuristique_alt(maze)
+    print(maze)
+    print(list(astar(maze, distance=alt.distance)))
@@ -10,6 +10,9 @@ Date: 2021-04-09
 """
 
 import abc  # Abstract Base Class
+import numbers
+
+import numpy as np
 
 
 class Labyrinthe(abc.ABC):
@@ -24,10 +27,17 @@ class Labyrinthe(abc.ABC):
 
     Attributs:
     - start: tuple (ligne, colonne) indiquant la cellule de départ
-    - out: tuple (ligne, colonne) indiquant la sortie
+    - out: tuple (ligne, colonne) indiquant la sortie, ou collection de tels
+           tuples pour un labyrinthe à plusieurs sorties (cf. sorties())
+    - version: entier augmenté à chaque modification de la grille, pour que
+               les solveurs gardant des données précalculées sur un
+               labyrinthe sachent quand les recalculer (reste à 0 pour un
+               labyrinthe qui ne change jamais)
 
     """
 
+    version = 0
+
     @abc.abstractmethod
     def __contains__(self, cell):
         """
@@ -50,3 +60,185 @@ class Labyrinthe(abc.ABC):
         visualiser la recherche de solution.
         """
         return ""
+
+    def neighbours(self, cell):
+        """
+        Retourner les voisins accessibles d'une cellule.
+
+        Permettra au solveur d'obtenir tous les déplacements possibles en un
+        seul appel. Cette implémentation par défaut teste les 4 directions
+        avec __contains__; les sous-classes peuvent fournir une version plus
+        rapide (voisins précalculés, masques de bits...).
+
+        Entrée: cell est un tuple (ligne, colonne) traversable
+        Sortie: liste des tuples (ligne, colonne) voisins traversables, dans
+                l'ordre droite, bas, gauche, haut
+        """
+        row, col = cell
+        return [voisin for voisin in ((row, col + 1), (row + 1, col),
+                                      (row, col - 1), (row - 1, col))
+                if voisin in self]
+
+    def sorties(self):
+        """
+        Retourner la liste des sorties du labyrinthe.
+
+        Permettra aux solveurs de traiter de la même manière un labyrinthe à
+        une seule sortie (out est un tuple (ligne, colonne)) et un labyrinthe
+        à plusieurs sorties (out est une collection de tels tuples).
+
+        Sortie: liste de tuples (ligne, colonne)
+        """
+        if all(isinstance(coordonnee, numbers.Integral)
+               for coordonnee in self.out):
+            return [tuple(self.out)]
+        return [tuple(sortie) for sortie in self.out]
+
+    def sortie_unique(self):
+        """
+        Retourner l'unique sortie du labyrinthe.
+
+        Permettra aux solveurs qui ne visent qu'une sortie de rejeter
+        clairement un labyrinthe à plusieurs sorties (cf. solveur_sorties),
+        au lieu d'échouer plus loin sur un tuple de tuples.
+
+        Sortie: tuple (ligne, colonne)
+        """
+        sorties = self.sorties()
+        if len(sorties) != 1:
+            raise ValueError(f"le labyrinthe a {len(sorties)} sorties: "
+                             "utiliser solveur_sorties.astar")
+        return sorties[0]
+
+    def connectes(self, cell1, cell2):
+        """
+        Les cellules cell1 et cell2 sont-elles reliées par un chemin?
+
+        Permettra aux solveurs de rejeter immédiatement une requête sans
+        solution, au lieu d'explorer toute la partie accessible du
+        labyrinthe. Cette implémentation par défaut lit les étiquettes de
+        composantes connexes calculées par composantes(); les sous-classes
+        peuvent tenir à jour un index plus rapide (union-find...).
+
+        Entrée: cell1 et cell2 sont des tuples (ligne, colonne)
+        Sortie: True si les deux cellules sont traversables et reliées
+        """
+        if cell1 not in self or cell2 not in self:
+            return False
+        etiquettes = self.composantes()
+        return etiquettes.item(cell1) == etiquettes.item(cell2)
+
+    def composantes(self):
+        """
+        Retourner les étiquettes des composantes connexes du labyrinthe.
+
+        Les composantes sont obtenues par remplissage "bit-parallèle": la
+        grille est codée en un seul entier Python (un bit par cellule, plus
+        une colonne de garde par ligne pour éviter de passer d'une ligne à la
+        suivante), et chaque étape du remplissage avance d'un pas dans toutes
+        les directions à la fois par décalages et masques. Le résultat est
+        gardé en cache tant que l'attribut version ne change pas.
+
+        Sortie: tableau NumPy int32 de la forme de matrice(), numéro de
+                composante de chaque cellule (-1 pour les murs)
+        """
+        cache = getattr(self, "_composantes", None)
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+        matrice = self.matrice()
+        n_rows, n_cols = matrice.shape
+        largeur = n_cols + 1  # colonne de garde, toujours fermée
+        bits = np.zeros((n_rows, largeur), dtype=bool)
+        bits[:, :n_cols] = matrice
+        n_bits = bits.size
+        restant = int.from_bytes(
+            np.packbits(bits.ravel(), bitorder="little").tobytes(), "little")
+        etiquettes = np.full(n_bits, -1, dtype=np.int32)
+        numero = 0
+        while restant:
+            composante = restant & -restant  # cellule ouverte non étiquetée
+            while True:
+                suivante = (composante | composante << 1 | composante >> 1
+                            | composante << largeur | composante >> largeur
+                            ) & restant
+                if suivante == composante:
+                    break
+                composante = suivante
+            restant ^= composante
+            if composante & (composante - 1) == 0:  # cellule isolée
+                etiquettes[composante.bit_length() - 1] = numero
+            else:
+                masque = np.unpackbits(
+                    np.frombuffer(composante.to_bytes((n_bits + 7) // 8,
+                                                      "little"),
+                                  dtype=np.uint8),
+                    count=n_bits, bitorder="little").view(bool)
+                etiquettes[masque] = numero
+            numero += 1
+        etiquettes = etiquettes.reshape(n_rows, largeur)[:, :n_cols]
+        self._composantes = (self.version, etiquettes)
+        return etiquettes
+
+    def dimensions(self):
+        """
+        Retourner les dimensions (lignes, colonnes) de la grille.
+
+        Permettra aux solveurs qui indexent leurs structures par cellule de
+        les dimensionner sans lire toute la grille. Cette implémentation par
+        défaut passe par matrice(); les sous-classes qui connaissent leurs
+        dimensions (ou ne gardent pas toute la grille) peuvent les retourner
+        directement.
+        """
+        return self.matrice().shape
+
+    def matrice(self):
+        """
+        Retourner la grille complète sous forme de tableau NumPy booléen.
+
+        Permettra aux solveurs et visualiseurs de lire toute la grille d'un
+        coup. Cette implémentation par défaut reconstruit le tableau à partir
+        de __str__ et __contains__; les sous-classes qui stockent déjà un
+        tableau peuvent le retourner directement, sans copie.
+
+        Sortie: tableau de forme (lignes, colonnes), True là où la cellule est
+                traversable
+        """
+        lignes = str(self).split("\n")
+        n_rows = len(lignes)
+        n_cols = max(len(ligne) for ligne in lignes)
+        return np.array([[(row, col) in self for col in range(n_cols)]
+                         for row in range(n_rows)], dtype=bool)
+
+
+class GrillePlate():
+    """
+    Vue "aplatie" d'un labyrinthe pour les solveurs travaillant sur indices.
+
+    La grille est entourée d'une bordure de murs, puis chaque cellule
+    (ligne, colonne) reçoit l'indice entier ligne * n_cols + colonne dans la
+    grille bordée, soit (ligne + 1) * n_cols + colonne + 1 en coordonnées
+    d'origine. Les voisins d'un indice s'obtiennent en lui ajoutant un des
+    décalages de directions, sans risque de sortir du tableau grâce à la
+    bordure.
+
+    Attributs:
+    - n_rows, n_cols: dimensions de la grille bordée
+    - cases: bytes contenant 1 là où la cellule est traversable, 0 sinon
+    - directions: décalages entiers pour droite, bas, gauche, haut
+    """
+
+    def __init__(self, grid):
+        """Construire la vue à partir de la matrice du labyrinthe."""
+        matrice = np.pad(grid.matrice(), 1)  # bordure de False = murs
+        self.n_rows, self.n_cols = matrice.shape
+        self.cases = matrice.tobytes()
+        self.directions = (1, self.n_cols, -1, -self.n_cols)
+
+    def indice(self, cell):
+        """Retourner l'indice plat d'un tuple (ligne, colonne)."""
+        return (cell[0] + 1) * self.n_cols + cell[1] + 1
+
+    def cellule(self, indice):
+        """Retourner le tuple (ligne, colonne) d'un indice plat."""
+        row, col = divmod(indice, self.n_cols)
+        return (row - 1, col - 1)
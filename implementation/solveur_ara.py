@@ -0,0 +1,137 @@
+"""
+Solveur "anytime" ARA* (Anytime Repairing A*).
+
+Quand un chemin doit être obtenu dans un délai donné, mieux vaut un chemin
+un peu trop long tout de suite que le chemin optimal trop tard. ARA* lance
+d'abord une recherche A* avec une heuristique gonflée d'un facteur epsilon
+(priorité = coût réel + epsilon * heuristique): elle explore beaucoup moins
+de noeuds et fournit vite un chemin au plus epsilon fois plus long que
+l'optimal. Puis il diminue epsilon et améliore ce chemin en réutilisant les
+coûts déjà calculés: seuls les noeuds dont le coût a baissé depuis leur
+évaluation (noeuds "incohérents") sont réexaminés.
+
+On s'appuie sur les structures de solveur_astar_v3: QueuePrioritaire pour
+la marge, dictionnaires cout_reel et parent.
+
+Author: Dalker
+Date: 2021.06.11
+"""
+
+import heapq
+import math
+import time
+
+from solveur_astar_v3 import manhattan_distance, QueuePrioritaire
+
+
+def solutions(grid, distance=manhattan_distance, epsilon=3, pas=0.5,
+              duree=None, expansions=None):
+    """
+    Générer des chemins de grid.start à grid.out de plus en plus courts.
+
+    Chaque élément généré est un tuple (chemin, borne), où chemin est la
+    liste des cellules du chemin et borne un facteur garantissant que
+    chemin n'est pas plus de borne fois plus long que le chemin optimal.
+    Le dernier chemin généré a une borne de 1, sauf si la génération
+    s'arrête avant, faute de budget:
+    - duree: temps maximal en secondes (None: illimité)
+    - expansions: nombre maximal de noeuds évalués (None: illimité)
+
+    L'heuristique distance doit être admissible et cohérente (c'est le cas
+    de la distance de Manhattan). epsilon est le facteur de gonflement
+    initial, diminué de pas après chaque chemin trouvé.
+
+    Lève ValueError s'il n'y a pas de solution.
+    """
+    if duree is not None:
+        echeance = time.monotonic() + duree
+    out = grid.sortie_unique()
+    cout_reel = {grid.start: 0}
+    parent = {grid.start: None}
+    marge = QueuePrioritaire(grid.start)
+    fermes = set()  # noeuds évalués pendant la recherche en cours
+    incoherents = set()  # noeuds fermés dont le coût a baissé depuis
+    n_expansions = 0
+
+    while True:
+        # améliorer le chemin avec le facteur epsilon courant
+        while True:
+            priorite = marge.minimum()
+            if priorite is None:
+                if out not in cout_reel:
+                    raise ValueError("A*: la grille fournie n'a pas de"
+                                     " solution")
+                break
+            if out in cout_reel and cout_reel[out] <= priorite:
+                break  # aucun noeud de la marge ne peut améliorer la sortie
+            noeud_courant = marge.pop()
+            if noeud_courant in fermes:
+                continue  # entrée périmée
+            if expansions is not None and n_expansions >= expansions:
+                return
+            if duree is not None and time.monotonic() > echeance:
+                return
+            n_expansions += 1
+            fermes.add(noeud_courant)
+            for voisin in grid.neighbours(noeud_courant):
+                cout_voisin = cout_reel[noeud_courant] + 1
+                if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
+                    continue  # on a un meilleur chemin pour arriver ici
+                cout_reel[voisin] = cout_voisin
+                parent[voisin] = noeud_courant
+                if voisin in fermes:
+                    incoherents.add(voisin)
+                else:
+                    marge.insert(cout_voisin
+                                 + epsilon * distance(voisin, out), voisin)
+
+        # chemin trouvé et borne prouvée: le coût optimal est au moins le
+        # plus petit coût réel + heuristique des noeuds encore à examiner
+        restants = incoherents.union(noeud for _, noeud in marge
+                                     if noeud not in fermes)
+        minorant = min((cout_reel[noeud] + distance(noeud, out)
+                        for noeud in restants), default=cout_reel[out])
+        borne = min(epsilon, cout_reel[out] / minorant) if minorant else 1
+        etape = out
+        chemin = []
+        while etape is not None:
+            chemin.append(etape)
+            etape = parent[etape]
+        chemin.reverse()
+        yield chemin, borne
+        if borne <= 1:
+            return  # chemin optimal
+
+        # recommencer avec un epsilon plus petit, en reprenant la marge et
+        # les noeuds incohérents
+        epsilon = max(1, epsilon - pas)
+        marge = QueuePrioritaire(grid.start)
+        marge.queue = [(cout_reel[noeud] + epsilon * distance(noeud, out),
+                        noeud) for noeud in restants]
+        heapq.heapify(marge.queue)
+        fermes = set()
+        incoherents = set()
+
+
+def astar_anytime(grid, distance=manhattan_distance, epsilon=3, pas=0.5,
+                  duree=None, expansions=None):
+    """
+    Retourner le meilleur chemin trouvé dans le budget donné.
+
+    Mêmes paramètres que solutions(). Retourne un tuple (chemin, borne);
+    si le budget est épuisé avant de trouver un premier chemin, chemin vaut
+    None et borne math.inf.
+    """
+    meilleur = (None, math.inf)
+    for meilleur in solutions(grid, distance, epsilon, pas, duree,
+                              expansions):
+        pass
+    return meilleur
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE30 as maze
+    print(maze)
+    for chemin, borne in solutions(maze):
+        print(len(chemin), borne)
@@ -0,0 +1,165 @@
+"""
+Solveur pour labyrinthes "parfaits", sans queue prioritaire.
+
+Un labyrinthe est parfait quand ses cellules ouvertes forment un arbre:
+il existe alors un unique chemin entre deux cellules. C'est le cas des
+labyrinthes de generateur_ab.Maze avec destruction_murs = 0, puisque
+l'algorithme d'Aldous-Broder produit un arbre couvrant.
+
+On construit une fois pour toutes, en un seul parcours linéaire, un index
+parent/profondeur de l'arbre. Chaque requête de chemin est ensuite résolue
+en remontant depuis les deux extrémités jusqu'à leur ancêtre commun
+(Lowest Common Ancestor), en temps proportionnel à la longueur du chemin.
+L'index est gardé en cache pour chaque labyrinthe, tant que son attribut
+version ne change pas.
+
+Author: Dalker
+Date: 2021.06.07
+"""
+
+import array
+import weakref
+
+import numpy as np
+
+import labyrinthe
+import solveur_astar_v4
+
+_CACHE = weakref.WeakKeyDictionary()
+
+
+class LabyrintheImparfait(ValueError):
+    """Le labyrinthe contient un cycle: ce n'est pas un arbre."""
+
+
+class ArbreLabyrinthe():
+    """
+    Index d'un labyrinthe parfait pour répondre à des requêtes de chemin.
+
+    Attributs:
+    - plate: labyrinthe.GrillePlate du labyrinthe
+    - parent: array d'entiers, indice plat du parent de chaque cellule
+              (-1 pour une racine ou une cellule fermée)
+    - profondeur: array d'entiers, distance de chaque cellule à sa racine
+                  (-1 pour une cellule fermée)
+    - racine: array d'entiers, indice plat de la racine de chaque cellule,
+              pour distinguer les différentes composantes connexes
+    """
+
+    def __init__(self, grid):
+        """
+        Construire l'index par un parcours en profondeur de tout l'arbre.
+
+        Chaque composante connexe est parcourue depuis sa première cellule
+        (grid.start pour la sienne). Lève LabyrintheImparfait si un cycle est
+        rencontré.
+        """
+        self.plate = labyrinthe.GrillePlate(grid)
+        cases = self.plate.cases
+        directions = self.plate.directions
+        taille = len(cases)
+        self.parent = parent = array.array("i", [-1]) * taille
+        self.profondeur = profondeur = array.array("i", [-1]) * taille
+        self.racine = racine = array.array("i", [-1]) * taille
+        ouvertes = np.flatnonzero(np.frombuffer(cases, dtype=np.uint8))
+        for origine in [self.plate.indice(grid.start)] + ouvertes.tolist():
+            if profondeur[origine] != -1:
+                continue  # composante déjà parcourue
+            profondeur[origine] = 0
+            racine[origine] = origine
+            pile = [origine]
+            while pile:
+                noeud = pile.pop()
+                precedent = parent[noeud]
+                suivant = profondeur[noeud] + 1
+                for direction in directions:
+                    voisin = noeud + direction
+                    if not cases[voisin] or voisin == precedent:
+                        continue
+                    if profondeur[voisin] != -1:
+                        raise LabyrintheImparfait(
+                            "le labyrinthe contient un cycle")
+                    parent[voisin] = noeud
+                    profondeur[voisin] = suivant
+                    racine[voisin] = origine
+                    pile.append(voisin)
+
+    def chemin(self, depart, arrivee):
+        """
+        Retourner la liste des cellules du chemin de depart à arrivee.
+
+        Lève ValueError si les deux cellules ne sont pas reliées.
+        """
+        parent, profondeur = self.parent, self.profondeur
+        noeud1 = self.plate.indice(depart)
+        noeud2 = self.plate.indice(arrivee)
+        if (profondeur[noeud1] == -1 or profondeur[noeud2] == -1
+                or self.racine[noeud1] != self.racine[noeud2]):
+            raise ValueError("Arbre: les cellules ne sont pas reliées")
+        montee1 = [noeud1]
+        montee2 = [noeud2]
+        while profondeur[noeud1] > profondeur[noeud2]:
+            noeud1 = parent[noeud1]
+            montee1.append(noeud1)
+        while profondeur[noeud2] > profondeur[noeud1]:
+            noeud2 = parent[noeud2]
+            montee2.append(noeud2)
+        while noeud1 != noeud2:  # remonter ensemble jusqu'à l'ancêtre commun
+            noeud1 = parent[noeud1]
+            montee1.append(noeud1)
+            noeud2 = parent[noeud2]
+            montee2.append(noeud2)
+        montee2.pop()  # l'ancêtre commun est déjà dans montee1
+        montee1.extend(reversed(montee2))
+        return [self.plate.cellule(noeud) for noeud in montee1]
+
+
+def arbre_labyrinthe(grid):
+    """
+    Retourner l'index de grid, construit une seule fois.
+
+    L'index est reconstruit si le labyrinthe a été modifié depuis. Lève
+    LabyrintheImparfait si le labyrinthe n'est pas un arbre (ce résultat
+    est lui aussi gardé en cache).
+    """
+    version, arbre = _CACHE.get(grid, (None, None))
+    if version != grid.version:
+        try:
+            arbre = ArbreLabyrinthe(grid)
+        except LabyrintheImparfait:
+            arbre = None
+        _CACHE[grid] = (grid.version, arbre)
+    if arbre is None:
+        raise LabyrintheImparfait("le labyrinthe contient un cycle")
+    return arbre
+
+
+def resoudre(grid, parfait=None):
+    """
+    Retourner le chemin de grid.start à grid.out.
+
+    - parfait=True: le labyrinthe est supposé parfait (LabyrintheImparfait
+      est levé sinon)
+    - parfait=False: on utilise directement solveur_astar_v4
+    - parfait=None: on détecte si le labyrinthe est parfait, et on se replie
+      sur solveur_astar_v4 sinon
+
+    Seule la première requête sur un labyrinthe donné construit l'index, les
+    suivantes ne font que remonter l'arbre en cache.
+    """
+    out = grid.sortie_unique()
+    if parfait is False:
+        return solveur_astar_v4.astar(grid)
+    try:
+        arbre = arbre_labyrinthe(grid)
+    except LabyrintheImparfait:
+        if parfait:
+            raise
+        return solveur_astar_v4.astar(grid)
+    return iter(arbre.chemin(grid.start, out))
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(resoudre(maze)))
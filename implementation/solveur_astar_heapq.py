@@ -11,8 +11,6 @@ import heapq
 
 from viewer import AstarView
 
-DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
-
 
 def distance1(x1, y1, x2, y2):
     """Retourner la "Manhattan distance" entre (x1, y1) et (x2, y2)."""
@@ -34,8 +32,9 @@ def astar(grid, distance=distance1, view=None):
     Trouver le plus court chemin vers la sortie.
 
     Entrée: grid est une grille rectangulaire sous forme d'objet
-    contenant les attributs start et out et implémentant l'opération
-    (row, col) in grid, retournant vrai si la cellule peut être traversée.
+    contenant les attributs start et out et implémentant la méthode
+    grid.neighbours((row, col)), retournant les cellules voisines pouvant
+    être traversées.
 
     Structures de donnée de travail:
     - closed: association des cellules déjà traversées à leur meilleur parent
@@ -51,7 +50,11 @@ def astar(grid, distance=distance1, view=None):
     - view: Viewer to initialize with access to fringe and closed and call for updates
     """
 
-    outrow, outcol = grid.out
+    out = grid.sortie_unique()
+    if not grid.connectes(grid.start, out):
+        print("Astar: Failed to find a solution.")
+        return None
+    outrow, outcol = out
     n_fringe = 0
     fringe = [(0, 0, 0, grid.start, None)]
     heapq.heapify(fringe)
@@ -62,9 +65,11 @@ def astar(grid, distance=distance1, view=None):
 
     while fringe != []:
         _, _,  cost, cell, parent = heapq.heappop(fringe)
+        if parent is not None and cell in closed:
+            continue  # entrée périmée: cellule déjà traitée par meilleur chemin
         if view is not None:
             astar_view.update()
-        if cell == grid.out:
+        if cell == out:
             backtrack = [cell]
             cell = parent
             while cell is not None:
@@ -73,17 +78,13 @@ def astar(grid, distance=distance1, view=None):
             if view is not None:
                 astar_view.showpath(backtrack)
             return reversed(backtrack)
-        row, col = cell
-        for prow, pcol in DIRECTIONS:
-            newrow, newcol = row + prow, col + pcol
-            if (newrow, newcol) not in grid:
-                continue  # mouvement pas possible: passer au suivant
-            if (newrow, newcol) in closed:
+        for newcell in grid.neighbours(cell):
+            if newcell in closed:
                 continue  # cellule déjà traitée: passer au suivant
             n_fringe += 1
+            newrow, newcol = newcell
             # heuristic = abs(outrow - newrow) + abs(outcol - newcol)
             heuristic = distance(outrow, outcol, newrow, newcol)
-            newcell = (newrow, newcol)
             heapq.heappush(fringe,
                            (cost+heuristic, n_fringe, cost+1, newcell, cell))
         closed[cell] = parent
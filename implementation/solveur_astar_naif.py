@@ -106,9 +106,8 @@ def astar(grid, distance=distance1, view=None, diagonals=False):
     Entrée: un objet Grid.
     Sortie: une liste de cellules successives constituant un chemin
     """
-    directions = ((0, 1, 1), (0, -1, 1), (-1, 0, 1), (1, 0, 1))
-    if diagonals:
-        directions += ((1, 1, 1.4), (1, -1, 1.4), (-1, 1, 1.4), (-1, -1, 1.4))
+    out = grid.sortie_unique()
+    diagonales = ((1, 1, 1.4), (1, -1, 1.4), (-1, 1, 1.4), (-1, -1, 1.4))
     closed = dict()  # associations cellule_traitée -> prédecesseur
     fringe = Fringe(grid.start)  # file d'attente de cellules à traiter
     if view is not None:
@@ -118,7 +117,7 @@ def astar(grid, distance=distance1, view=None, diagonals=False):
         if current is None:
             log.debug("Le labyrinthe ne peut pas être résolu.")
             return None
-        if current == grid.out:
+        if current == out:
             log.debug("Found exit!")
             path = [current]
             current = predecessor
@@ -129,12 +128,17 @@ def astar(grid, distance=distance1, view=None, diagonals=False):
             if view is not None:
                 astar_view.showpath(path)
             return path
-        for direction in directions:
-            neighbour = tuple(current[j] + direction[j] for j in (0, 1))
-            if neighbour not in grid or neighbour in closed:
+        moves = [(neighbour, 1) for neighbour in grid.neighbours(current)]
+        if diagonals:
+            for drow, dcol, step in diagonales:
+                neighbour = (current[0] + drow, current[1] + dcol)
+                if neighbour in grid:
+                    moves.append((neighbour, step))
+        for neighbour, step in moves:
+            if neighbour in closed:
                 continue
-            neighbour_cost = cost + direction[2]
-            heuristic = neighbour_cost + distance(neighbour, grid.out)
+            neighbour_cost = cost + step
+            heuristic = neighbour_cost + distance(neighbour, out)
             fringe.append(neighbour,
                           neighbour_cost,
                           heuristic,
@@ -4,8 +4,8 @@ Solveur A* 3ème version après d'autres lectures.
 Ce module fournit un solveur qui s'attend à travailler sur une
 grille rectangulaire fournie comme un objet avec des attributs
 start et out (tuples de coordonnée de départ et arrivée du
-labyrinthe) et une métode __contains__ permettant de vérifier
-si un tuple de coordonnées est accessible dans la grille.
+labyrinthe) et une métode neighbours retournant les voisins
+accessibles d'un tuple de coordonnées dans la grille.
 
 Author: Dalker
 Date: 2021-05-14
@@ -13,6 +13,7 @@ Date: 2021-05-14
 
 import heapq
 
+from etat_recherche import EtatRecherche
 from viewer import AstarView
 
 
@@ -43,6 +44,14 @@ class QueuePrioritaire():
         """Retourner la file d'attente sous forme ascii."""
         return str(self.queue)
 
+    def __iter__(self):
+        """Parcourir les tuples (priorité, noeud) de la queue."""
+        return iter(self.queue)
+
+    def __len__(self):
+        """Retourner le nombre d'entrées (y compris périmées) de la queue."""
+        return len(self.queue)
+
     def insert(self, priority, node):
         """Insérer un noeud dans la queue."""
         heapq.heappush(self.queue, (priority, node))
@@ -54,20 +63,189 @@ class QueuePrioritaire():
         except IndexError:  # la queue est vide
             return None
 
+    def minimum(self):
+        """Obtenir la priorité du prochain noeud, sans le retirer."""
+        if not self.queue:  # la queue est vide
+            return None
+        return self.queue[0][0]
+
+
+class QueueSeaux():
+    """
+    Queue prioritaire "à seaux" (algorithme de Dial) pour gérer la marge de A*.
+
+    Réservée aux priorités entières positives: chaque priorité possède son
+    propre seau (liste de noeuds), ce qui permet insertion et extraction du
+    minimum en temps constant (amorti) au lieu du O(log n) de heapq. Sur nos
+    grilles, tous les pas coûtent 1 et l'heuristique de Manhattan est
+    entière, donc les priorités restent dans une petite plage d'entiers.
+
+    À priorité égale, le dernier noeud inséré sort en premier (LIFO).
 
-def astar(grid, distance=manhattan_distance, view=None):
+    Attributs:
+    - seaux: liste de listes de noeuds, indexée par priorité
+    - minimum: plus petite priorité dont le seau peut être non vide
+    - taille: nombre de noeuds dans la queue
+    """
+
+    def __init__(self, start):
+        """Initialiser la queue à partir du noeud de départ."""
+        self.seaux = [[start]]
+        self.minimum = 0
+        self.taille = 1
+
+    def __str__(self):
+        """Retourner la file d'attente sous forme ascii."""
+        return str(list(self))
+
+    def __iter__(self):
+        """Parcourir les tuples (priorité, noeud) de la queue."""
+        for priority, seau in enumerate(self.seaux):
+            for node in seau:
+                yield priority, node
+
+    def __len__(self):
+        """Retourner le nombre d'entrées (y compris périmées) de la queue."""
+        return self.taille
+
+    def insert(self, priority, node):
+        """Insérer un noeud dans la queue."""
+        if priority >= len(self.seaux):
+            self.seaux.extend([] for _ in range(priority + 1
+                                                - len(self.seaux)))
+        self.seaux[priority].append(node)
+        if priority < self.minimum:
+            self.minimum = priority
+        self.taille += 1
+
+    def pop(self):
+        """Obtenir le prochain noeud."""
+        if self.taille == 0:  # la queue est vide
+            return None
+        while not self.seaux[self.minimum]:
+            self.minimum += 1
+        self.taille -= 1
+        return self.seaux[self.minimum].pop()
+
+
+class QueueIndexee():
+    """
+    Queue prioritaire en tas binaire indexé pour gérer la marge de A*.
+
+    Contrairement à QueuePrioritaire, qui ajoute une nouvelle entrée à chaque
+    amélioration du coût d'un noeud et laisse les anciennes en place, cette
+    queue garde la position de chaque noeud dans le tas et modifie sa
+    priorité sur place ("decrease-key"). La queue ne contient donc jamais
+    plus d'une entrée par noeud.
+
+    L'ordre de sortie est le même que celui de QueuePrioritaire: priorité
+    puis noeud.
+
+    Attributs:
+    - queue: tas binaire de tuples (priorité, noeud)
+    - position: association noeud -> indice de son entrée dans queue
+    """
+
+    def __init__(self, start):
+        """Initialiser la queue à partir du noeud de départ."""
+        self.queue = [(0, start)]
+        self.position = {start: 0}
+
+    def __str__(self):
+        """Retourner la file d'attente sous forme ascii."""
+        return str(self.queue)
+
+    def __iter__(self):
+        """Parcourir les tuples (priorité, noeud) de la queue."""
+        return iter(self.queue)
+
+    def __len__(self):
+        """Retourner le nombre de noeuds dans la queue."""
+        return len(self.queue)
+
+    def insert(self, priority, node):
+        """Insérer un noeud dans la queue, ou modifier sa priorité."""
+        if node in self.position:
+            index = self.position[node]
+            ancienne = self.queue[index]
+            self.queue[index] = (priority, node)
+            if (priority, node) < ancienne:
+                self._monter(index)
+            else:
+                self._descendre(index)
+        else:
+            self.queue.append((priority, node))
+            self.position[node] = len(self.queue) - 1
+            self._monter(len(self.queue) - 1)
+
+    def pop(self):
+        """Obtenir le prochain noeud."""
+        if not self.queue:  # la queue est vide
+            return None
+        premier = self.queue[0]
+        dernier = self.queue.pop()
+        del self.position[premier[1]]
+        if self.queue:
+            self.queue[0] = dernier
+            self.position[dernier[1]] = 0
+            self._descendre(0)
+        return premier[1]
+
+    def _monter(self, index):
+        """Faire remonter l'entrée d'indice donné jusqu'à sa place."""
+        queue, position = self.queue, self.position
+        entree = queue[index]
+        while index > 0:
+            index_parent = (index - 1) // 2
+            parent = queue[index_parent]
+            if not entree < parent:
+                break
+            queue[index] = parent
+            position[parent[1]] = index
+            index = index_parent
+        queue[index] = entree
+        position[entree[1]] = index
+
+    def _descendre(self, index):
+        """Faire descendre l'entrée d'indice donné jusqu'à sa place."""
+        queue, position = self.queue, self.position
+        taille = len(queue)
+        entree = queue[index]
+        while True:
+            index_enfant = 2 * index + 1
+            if index_enfant >= taille:
+                break
+            if (index_enfant + 1 < taille
+                    and queue[index_enfant + 1] < queue[index_enfant]):
+                index_enfant += 1
+            enfant = queue[index_enfant]
+            if not enfant < entree:
+                break
+            queue[index] = enfant
+            position[enfant[1]] = index
+            index = index_enfant
+        queue[index] = entree
+        position[entree[1]] = index
+
+
+def astar(grid, distance=manhattan_distance, view=None, queue=None,
+          etat=EtatRecherche):
     """
     Exécuter l'Algorithme A* et retourner le chemin optimal.
 
     L'objet grid fournit un départ grid.start, une arrivée grid.out et un moyen
-    de vérifier si des coordonnées (x, y) sont accessibles: (x, y) in grid.
+    d'obtenir les voisins accessibles de coordonnées (x, y):
+    grid.neighbours((x, y)).
 
     En cours d'évolution, l'algorithme classe les noeuds connus en:
     - marge: ensemble des noeuds connectés pas encore évalués (initialisée avec
-             le noeud de départ)
-    - noeuds déjà évalués, avec leur cout_reel (coût pour y arriver par le
-      meilleur chemin trouvé jusqu'à présent) et predecesseur (noeuds précédent
-      dans le meilleur chemin chemin trouvé pour y arriver jusqu'à présent)
+             le noeud de départ); chaque entrée porte le noeud, son cout_reel
+             (coût pour y arriver par le chemin qui l'a proposé) et son
+             predecesseur sur ce chemin, comme dans solveur_astar_heapq
+    - noeuds déjà évalués (fermés): le premier passage d'un noeud en tête de
+      marge fixe son cout_reel et son predecesseur, gardés (le predecesseur
+      seulement) dans un etat_recherche.EtatRecherche compact; les entrées
+      suivantes pour ce noeud sont périmées
 
     La marge est une queue prioritaire avec comme priorité le coût réel pour
     arriver au noeud + le coût heuristique pour poursuivre jusqu'à la sortie.
@@ -77,42 +255,80 @@ def astar(grid, distance=manhattan_distance, view=None):
     la marge aurait une distance réelle inférieure et serait prioritaire, vu
     qu'une heuristique admissible n'a pas le droit de sur-estimer les
     distances.
+
+    Le paramètre queue permet d'imposer la classe de queue prioritaire. Par
+    défaut, on prend QueueSeaux si la distance fournie est entière (toutes
+    les priorités le seront alors aussi), QueuePrioritaire sinon.
+
+    Fermer un noeud dès sa première sortie de la marge suppose une
+    heuristique consistante (distance(a, out) <= 1 + distance(b, out) pour
+    deux voisins a et b), ce qui est le cas des distances nulle et de
+    Manhattan. Comme les entrées ne se confondent jamais, QueueIndexee n'a
+    plus de priorité à modifier sur place.
+
+    Le paramètre etat donne la classe qui garde les noeuds vus et fermés:
+    EtatRecherche (compact, par défaut) ou etat_recherche.EtatDict (dict et
+    set, pour comparaison).
+
+    Avant toute recherche, on vérifie avec grid.connectes que la sortie est
+    accessible depuis le départ.
+
+    Sur une grille qui ne garde qu'une fenêtre de ses lignes (cf.
+    generateur_eller.LabyrintheEller), un noeud de la marge dont la ligne
+    est déjà oubliée ne peut plus être développé: on l'abandonne. La grille
+    étant un labyrinthe parfait, le seul chemin vers la sortie est alors
+    trouvé tant qu'il ne passe pas par un noeud abandonné; sinon, la marge
+    se vide et on lève une IndexError.
     """
 
-    marge = QueuePrioritaire(grid.start)
-    cout_reel = {grid.start: 0}
-    parent = {grid.start: None}
+    out = grid.sortie_unique()
+    if not grid.connectes(grid.start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    if queue is None:
+        if isinstance(distance(grid.start, out), int):
+            queue = QueueSeaux
+        else:
+            queue = QueuePrioritaire
+    marge = queue((grid.start, 0, None))
+    cout_reel = etat(grid, grid.start)
 
     if view is not None:
-        viewer = AstarView(grid, marge.queue, cout_reel, view)
+        viewer = AstarView(grid, None, cout_reel, view)
 
+    # accès locaux rapides
+    pop, insert = marge.pop, marge.insert
+    fermer, ouvrir = cout_reel.fermer, cout_reel.ouvrir
+    neighbours = grid.neighbours
+    abandons = 0  # noeuds des lignes oubliées par une grille à fenêtre
     while True:
         if view is not None:
             viewer.update()
-        noeud_courant = marge.pop()
-        if noeud_courant is None:
+        entree = pop()
+        if entree is None:
+            if abandons:
+                raise IndexError("A*: le chemin passe par des lignes déjà "
+                                 "oubliées par la grille")
             raise ValueError("A*: la grille fournie n'a pas de solution")
-        if noeud_courant == grid.out:
-            break  # on a trouvé un chemin optimal vers la sortie
-        for direction in ((0, 1), (1, 0), (0, -1), (-1, 0)):
-            # calculer coordonnées d'un voisin potentiel
-            voisin = tuple([noeud_courant[i] + direction[i] for i in (0, 1)])
-            if voisin not in grid:
-                continue  # on ne peut pas accéder à ces coordonnées
-            cout_voisin = cout_reel[noeud_courant] + 1
-            if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
-                continue  # on a un meilleur chemin pour arriver à ce voisin
+        noeud_courant, cout_courant, predecesseur = entree
+        try:
+            if not fermer(noeud_courant, predecesseur):
+                continue  # entrée périmée: noeud déjà fermé (meilleur chemin)
+            if noeud_courant == out:
+                break  # on a trouvé un chemin optimal vers la sortie
+            voisins = neighbours(noeud_courant)
+        except IndexError:
+            abandons += 1
+            continue
+        cout_voisin = cout_courant + 1
+        for voisin in voisins:
+            if voisin == predecesseur or not ouvrir(voisin):
+                continue  # on a déjà le meilleur chemin vers ce voisin
             # on est arrivé jusqu'ici: ajouter le voisin à la marge
-            cout_reel[voisin] = cout_voisin
-            parent[voisin] = noeud_courant
-            marge.insert(cout_voisin + distance(voisin, grid.out), voisin)
+            insert(cout_voisin + distance(voisin, out),
+                   (voisin, cout_voisin, noeud_courant))
 
     # on est arrivé jusqu'ici: le chemin optimal a été trouvé
-    etape = grid.out
-    chemin = []
-    while etape is not None:
-        chemin.append(etape)
-        etape = parent[etape]
+    chemin = cout_reel.chemin(out)
     if view is not None:
         viewer.showpath(chemin)
     return reversed(chemin)
@@ -7,8 +7,8 @@ utilisée pour les visuels.
 Ce module fournit un solveur qui s'attend à travailler sur une
 grille rectangulaire fournie comme un objet avec des attributs
 start et out (tuples de coordonnée de départ et arrivée du
-labyrinthe) et une métode __contains__ permettant de vérifier
-si un tuple de coordonnées est accessible dans la grille.
+labyrinthe) et une métode neighbours retournant les voisins
+accessibles d'un tuple de coordonnées dans la grille.
 
 Author: Dalker
 Date: 2021.06.01
@@ -61,7 +61,8 @@ def astar(grid, distance=manhattan_distance):
     Exécuter l'Algorithme A* et retourner le chemin optimal.
 
     L'objet grid fournit un départ grid.start, une arrivée grid.out et un moyen
-    de vérifier si des coordonnées (x, y) sont accessibles: (x, y) in grid.
+    d'obtenir les voisins accessibles de coordonnées (x, y):
+    grid.neighbours((x, y)).
 
     En cours d'évolution, l'algorithme classe les noeuds connus en:
     - marge: ensemble des noeuds connectés pas encore évalués (initialisée avec
@@ -80,6 +81,7 @@ def astar(grid, distance=manhattan_distance):
     distances.
     """
 
+    out = grid.sortie_unique()
     marge = QueuePrioritaire(grid.start)
     cout_reel = {grid.start: 0}
     parent = {grid.start: None}
@@ -88,23 +90,19 @@ def astar(grid, distance=manhattan_distance):
         noeud_courant = marge.pop()
         if noeud_courant is None:
             raise ValueError("A*: la grille fournie n'a pas de solution")
-        if noeud_courant == grid.out:
+        if noeud_courant == out:
             break  # on a trouvé un chemin optimal vers la sortie
-        for direction in ((0, 1), (1, 0), (0, -1), (-1, 0)):
-            # calculer coordonnées d'un voisin potentiel
-            voisin = tuple([noeud_courant[i] + direction[i] for i in (0, 1)])
-            if voisin not in grid:
-                continue  # on ne peut pas accéder à ces coordonnées
+        for voisin in grid.neighbours(noeud_courant):
             cout_voisin = cout_reel[noeud_courant] + 1
             if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
                 continue  # on a un meilleur chemin pour arriver à ce voisin
             # on est arrivé jusqu'ici: ajouter le voisin à la marge
             cout_reel[voisin] = cout_voisin
             parent[voisin] = noeud_courant
-            marge.insert(cout_voisin + distance(voisin, grid.out), voisin)
+            marge.insert(cout_voisin + distance(voisin, out), voisin)
 
     # on est arrivé jusqu'ici: le chemin optimal a été trouvé
-    etape = grid.out
+    etape = out
     chemin = []
     while etape is not None:
         chemin.append(etape)
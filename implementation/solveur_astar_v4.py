@@ -0,0 +1,124 @@
+"""
+Solveur A* 4ème version, travaillant sur des indices entiers.
+
+Ce module fournit un solveur équivalent à solveur_astar_v3 (même chemin
+optimal, même format de sortie) mais qui évite toute manipulation de tuples
+et de dict pendant la recherche:
+- les cellules sont des indices plats d'une labyrinthe.GrillePlate
+- les voisins s'obtiennent par simple addition d'un décalage entier
+- cout_reel et parent sont des array.array d'entiers préalloués
+- l'heuristique vers la sortie est précalculée (vectorisée avec NumPy pour
+  les distances nulle et Manhattan)
+- la marge est un heapq d'entiers priorité * taille + indice, ce qui donne
+  le même ordre de priorité que les tuples (priorité, (ligne, colonne)) de v3
+
+Author: Dalker
+Date: 2021.06.04
+"""
+
+import array
+import heapq
+
+import numpy as np
+
+import labyrinthe
+from solveur_astar_v3 import manhattan_distance, null_distance
+
+
+def heuristiques(plate, out, distance):
+    """
+    Précalculer l'heuristique de chaque indice vers la sortie.
+
+    Les distances nulle et Manhattan sont calculées d'un coup avec NumPy.
+    Pour une autre fonction distance, le tableau est rempli de -1 et sera
+    complété à la demande par le solveur.
+
+    La fonction distance doit retourner des entiers.
+    """
+    if distance is null_distance:
+        return array.array("i", bytes(4 * plate.n_rows * plate.n_cols))
+    if distance is manhattan_distance:
+        rows = np.abs(np.arange(plate.n_rows) - (out[0] + 1))
+        cols = np.abs(np.arange(plate.n_cols) - (out[1] + 1))
+        valeurs = (rows[:, np.newaxis] + cols).astype(np.int32)
+        return array.array("i", valeurs.tobytes())
+    return array.array("i", [-1]) * (plate.n_rows * plate.n_cols)
+
+
+def astar(grid, distance=manhattan_distance, depart=None, arrivee=None,
+          plate=None):
+    """
+    Exécuter l'Algorithme A* et retourner le chemin optimal.
+
+    Même algorithme et même interface que solveur_astar_v3.astar (sans
+    visualisation), cf. la documentation de ce dernier.
+
+    Les paramètres optionnels permettent de chercher un chemin entre
+    d'autres cellules que grid.start et grid.out sans modifier grid:
+    - depart, arrivee: tuples (ligne, colonne), par défaut grid.start et
+      grid.out
+    - plate: labyrinthe.GrillePlate de grid déjà construite, à réutiliser
+      pour plusieurs requêtes sur un même labyrinthe
+    """
+    if depart is None:
+        depart = grid.start
+    if arrivee is None:
+        arrivee = grid.sortie_unique()
+    if not grid.connectes(depart, arrivee):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    if plate is None:
+        plate = labyrinthe.GrillePlate(grid)
+    cases = plate.cases
+    directions = plate.directions
+    taille = len(cases)
+    source = plate.indice(depart)
+    cible = plate.indice(arrivee)
+    heuristique = heuristiques(plate, arrivee, distance)
+    if heuristique[source] < 0:
+        heuristique[source] = distance(depart, arrivee)
+
+    cout_reel = array.array("i", [-1]) * taille
+    parent = array.array("i", [-1]) * taille
+    cout_reel[source] = 0
+    marge = [heuristique[source] * taille + source]
+    heappush, heappop = heapq.heappush, heapq.heappop  # accès locaux rapides
+
+    while True:
+        if not marge:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        priorite, noeud_courant = divmod(heappop(marge), taille)
+        if noeud_courant == cible:
+            break  # on a trouvé un chemin optimal vers la sortie
+        cout_voisin = cout_reel[noeud_courant]
+        if cout_voisin + heuristique[noeud_courant] != priorite:
+            continue  # entrée périmée: un meilleur chemin a été trouvé depuis
+        cout_voisin += 1
+        for direction in directions:
+            voisin = noeud_courant + direction
+            if not cases[voisin]:
+                continue  # on ne peut pas accéder à cette cellule
+            if 0 <= cout_reel[voisin] <= cout_voisin:
+                continue  # on a un meilleur chemin pour arriver à ce voisin
+            # on est arrivé jusqu'ici: ajouter le voisin à la marge
+            cout_reel[voisin] = cout_voisin
+            parent[voisin] = noeud_courant
+            estimation = heuristique[voisin]
+            if estimation < 0:
+                estimation = distance(plate.cellule(voisin), arrivee)
+                heuristique[voisin] = estimation
+            heappush(marge, (cout_voisin + estimation) * taille + voisin)
+
+    # on est arrivé jusqu'ici: le chemin optimal a été trouvé
+    etape = cible
+    chemin = []
+    while etape != -1:
+        chemin.append(plate.cellule(etape))
+        etape = parent[etape]
+    return reversed(chemin)
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(astar(maze, distance=manhattan_distance)))
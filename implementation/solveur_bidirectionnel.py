@@ -0,0 +1,105 @@
+"""
+Solveur A* bidirectionnel.
+
+Ce module fournit un solveur qui lance simultanément deux recherches A*:
+l'une depuis grid.start vers grid.out, l'autre depuis grid.out vers
+grid.start. Dans un long labyrinthe en couloirs, chaque recherche n'a alors
+à explorer qu'une partie du labyrinthe avant de rencontrer l'autre.
+
+Même interface que solveur_astar_v3: la grille fournit start, out et
+neighbours, et l'on retourne le chemin optimal de start à out.
+
+Author: Dalker
+Date: 2021.06.05
+"""
+
+import heapq
+
+from solveur_astar_v3 import manhattan_distance
+
+AVANT, ARRIERE = 0, 1  # sens des deux recherches
+
+
+def astar(grid, distance=manhattan_distance):
+    """
+    Exécuter l'algorithme A* bidirectionnel et retourner le chemin optimal.
+
+    Chaque sens de recherche garde sa marge (heapq de tuples (priorité, coût
+    réel, noeud)), ses cout_reel et ses parent, comme dans solveur_astar_v3.
+    À chaque pas, on développe le sens dont la marge est la plus petite.
+
+    Pour que les deux recherches restent compatibles, elles utilisent la même
+    heuristique "moyenne" (au signe près):
+        p(noeud) = (distance(noeud, out) - distance(start, noeud)) / 2
+    en avant et -p(noeud) en arrière, qui reste admissible et cohérente si
+    distance l'est. On manipule les priorités doublées pour rester en
+    nombres entiers.
+
+    Dès qu'un noeud est atteint par les deux recherches, on obtient un chemin
+    complet, dont on garde la plus petite longueur connue (meilleur). On
+    peut s'arrêter quand la somme des priorités minimales des deux marges
+    atteint meilleur: tout chemin plus court devrait passer par un noeud de
+    chaque marge dont les priorités se somment à moins que meilleur.
+    """
+    out = grid.sortie_unique()
+    if not grid.connectes(grid.start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    if grid.start == out:
+        return iter([grid.start])
+
+    def potentiel(noeud, sens):
+        """Retourner le double de l'heuristique moyenne dans le sens donné."""
+        ecart = distance(noeud, out) - distance(grid.start, noeud)
+        return ecart if sens == AVANT else -ecart
+
+    marges = ([(potentiel(grid.start, AVANT), 0, grid.start)],
+              [(potentiel(out, ARRIERE), 0, out)])
+    cout_reel = ({grid.start: 0}, {out: 0})
+    parent = ({grid.start: None}, {out: None})
+    meilleur = float("inf")  # longueur du meilleur chemin complet connu
+    jonction = None  # noeud où se rejoignent les deux moitiés de ce chemin
+
+    while marges[AVANT] and marges[ARRIERE]:
+        if marges[AVANT][0][0] + marges[ARRIERE][0][0] >= 2 * meilleur:
+            break  # aucun chemin plus court ne peut encore être trouvé
+        sens = AVANT if len(marges[AVANT]) <= len(marges[ARRIERE]) else ARRIERE
+        _, cout_courant, noeud_courant = heapq.heappop(marges[sens])
+        if cout_courant > cout_reel[sens][noeud_courant]:
+            continue  # entrée périmée: un meilleur chemin a été trouvé depuis
+        for voisin in grid.neighbours(noeud_courant):
+            cout_voisin = cout_courant + 1
+            if (voisin in cout_reel[sens]
+                    and cout_voisin >= cout_reel[sens][voisin]):
+                continue  # on a un meilleur chemin pour arriver à ce voisin
+            cout_reel[sens][voisin] = cout_voisin
+            parent[sens][voisin] = noeud_courant
+            heapq.heappush(marges[sens],
+                           (2 * cout_voisin + potentiel(voisin, sens),
+                            cout_voisin, voisin))
+            if voisin in cout_reel[1 - sens]:
+                longueur = cout_voisin + cout_reel[1 - sens][voisin]
+                if longueur < meilleur:
+                    meilleur = longueur
+                    jonction = voisin
+
+    if jonction is None:
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    # reconstituer les deux moitiés du chemin depuis la jonction
+    chemin = []
+    etape = jonction
+    while etape is not None:
+        chemin.append(etape)
+        etape = parent[AVANT][etape]
+    chemin.reverse()
+    etape = parent[ARRIERE][jonction]
+    while etape is not None:
+        chemin.append(etape)
+        etape = parent[ARRIERE][etape]
+    return iter(chemin)
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(astar(maze, distance=manhattan_distance)))
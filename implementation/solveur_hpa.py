@@ -0,0 +1,254 @@
+"""
+Solveur hiérarchique HPA* (Hierarchical Path-Finding A*).
+
+Pour de très grands labyrinthes, même un A* optimisé doit parcourir des
+millions de cellules par requête. On découpe donc la grille en "clusters"
+carrés de taille_cluster x taille_cluster cellules et on construit une fois
+pour toutes un graphe abstrait:
+- ses noeuds sont les cellules de "transition" de part et d'autre des
+  frontières entre clusters voisins (deux cellules ouvertes adjacentes de
+  deux clusters différents)
+- deux transitions appariées sont reliées par une arête de coût 1
+- deux transitions d'un même cluster sont reliées par une arête dont le coût
+  est la longueur du plus court chemin entre elles sans sortir du cluster
+
+Une requête relie le départ et l'arrivée aux transitions de leur cluster,
+cherche un chemin par A* dans le graphe abstrait, puis le raffine en chemin
+de cellules en ne parcourant que les clusters de ce chemin.
+
+Deux modes de construction sont possibles:
+- exact=False (HPA* classique): une seule transition au milieu de chaque
+  segment continu de frontière ouverte. Le graphe est plus petit, le chemin
+  est quasi-optimal.
+- exact=True: toutes les paires de cellules ouvertes de part et d'autre des
+  frontières sont des transitions. Tout chemin se décompose alors en
+  morceaux internes aux clusters entre transitions, donc le chemin trouvé
+  est optimal.
+
+Author: Dalker
+Date: 2021.06.09
+"""
+
+import array
+import heapq
+import weakref
+from collections import deque
+
+import numpy as np
+
+import labyrinthe
+from solveur_astar_v3 import manhattan_distance
+
+_CACHE = weakref.WeakKeyDictionary()  # labyrinthe -> {(taille, exact): graphe}
+
+
+class GrapheHPA():
+    """
+    Graphe abstrait HPA* d'un labyrinthe.
+
+    Attributs:
+    - plate: labyrinthe.GrillePlate du labyrinthe
+    - version: version du labyrinthe pour laquelle le graphe a été construit
+    - taille_cluster: côté des clusters, en cellules
+    - exact: True si toutes les transitions possibles ont été gardées
+    - clusters: array d'entiers, numéro du cluster de chaque indice plat
+                (-1 pour la bordure)
+    - aretes: association transition -> liste de tuples (voisin, coût)
+    - transitions: association numéro de cluster -> liste de ses transitions
+    """
+
+    def __init__(self, grid, taille_cluster=16, exact=False):
+        """Construire le graphe abstrait du labyrinthe grid."""
+        self.plate = plate = labyrinthe.GrillePlate(grid)
+        self.version = grid.version
+        self.taille_cluster = taille_cluster
+        self.exact = exact
+        matrice = grid.matrice()
+        n_rows, n_cols = matrice.shape
+        # numéro de cluster de chaque cellule de la grille bordée
+        par_ligne = -(-n_cols // taille_cluster)
+        rows = np.arange(n_rows) // taille_cluster
+        cols = np.arange(n_cols) // taille_cluster
+        clusters = np.full((plate.n_rows, plate.n_cols), -1, dtype=np.int32)
+        clusters[1:-1, 1:-1] = rows[:, np.newaxis] * par_ligne + cols
+        self.clusters = array.array("i", clusters.tobytes())
+        self.aretes = {}
+        self.transitions = {}
+        # transitions entre clusters voisins horizontalement puis verticalement
+        for col in range(taille_cluster, n_cols, taille_cluster):
+            ouvertes = np.flatnonzero(matrice[:, col - 1] & matrice[:, col])
+            for row in self._choisir(ouvertes.tolist()):
+                self._relier(plate.indice((row, col - 1)),
+                             plate.indice((row, col)))
+        for row in range(taille_cluster, n_rows, taille_cluster):
+            ouvertes = np.flatnonzero(matrice[row - 1, :] & matrice[row, :])
+            for col in self._choisir(ouvertes.tolist()):
+                self._relier(plate.indice((row - 1, col)),
+                             plate.indice((row, col)))
+        # arêtes internes aux clusters
+        for transitions in self.transitions.values():
+            for transition in transitions:
+                distances = self.parcourir(transition)[0]
+                for autre in transitions:
+                    if autre != transition and autre in distances:
+                        self.aretes[transition].append((autre,
+                                                        distances[autre]))
+
+    def _choisir(self, positions):
+        """
+        Choisir les transitions parmi les positions ouvertes d'une frontière.
+
+        En mode exact, on les garde toutes. Sinon, on garde le milieu de
+        chaque segment continu de positions, un segment ne dépassant pas la
+        frontière entre deux clusters.
+        """
+        if self.exact:
+            return positions
+        choisies = []
+        segment = []
+        for position in positions:
+            if segment and (position != segment[-1] + 1
+                            or position % self.taille_cluster == 0):
+                choisies.append(segment[len(segment) // 2])
+                segment = []
+            segment.append(position)
+        if segment:
+            choisies.append(segment[len(segment) // 2])
+        return choisies
+
+    def _relier(self, noeud1, noeud2):
+        """Ajouter une paire de transitions reliées par une arête de coût 1."""
+        for noeud, autre in ((noeud1, noeud2), (noeud2, noeud1)):
+            if noeud not in self.aretes:
+                self.aretes[noeud] = []
+                self.transitions.setdefault(self.clusters[noeud],
+                                            []).append(noeud)
+            self.aretes[noeud].append((autre, 1))
+
+    def parcourir(self, source, cible=None):
+        """
+        Parcourir en largeur le cluster de source, sans en sortir.
+
+        Retourne un tuple (distances, parent) de dict indexés par indices
+        plats. Si cible est donnée, le parcours s'arrête dès qu'elle est
+        atteinte.
+        """
+        cases, clusters = self.plate.cases, self.clusters
+        directions = self.plate.directions
+        cluster = clusters[source]
+        distances = {source: 0}
+        parent = {source: None}
+        file = deque([source])
+        while file:
+            noeud = file.popleft()
+            if noeud == cible:
+                break
+            suivant = distances[noeud] + 1
+            for direction in directions:
+                voisin = noeud + direction
+                if (cases[voisin] and clusters[voisin] == cluster
+                        and voisin not in distances):
+                    distances[voisin] = suivant
+                    parent[voisin] = noeud
+                    file.append(voisin)
+        return distances, parent
+
+    def raffiner(self, noeud1, noeud2):
+        """Retourner les indices d'un plus court chemin noeud1 -> noeud2."""
+        if self.clusters[noeud1] != self.clusters[noeud2]:
+            return [noeud1, noeud2]  # transitions appariées: cellules voisines
+        parent = self.parcourir(noeud1, noeud2)[1]
+        chemin = [noeud2]
+        while parent[chemin[-1]] is not None:
+            chemin.append(parent[chemin[-1]])
+        return chemin[::-1]
+
+    def chemin(self, depart, arrivee, distance=manhattan_distance):
+        """
+        Retourner la liste des cellules d'un chemin de depart à arrivee.
+
+        Lève ValueError s'il n'y a pas de solution.
+        """
+        plate = self.plate
+        source = plate.indice(depart)
+        cible = plate.indice(arrivee)
+        # arêtes temporaires reliant depart et arrivee à leur cluster
+        temporaires = {source: [], cible: []}
+        for extremite in (source, cible):
+            distances = self.parcourir(extremite)[0]
+            autres = self.transitions.get(self.clusters[extremite], [])
+            if extremite == source:
+                autres = autres + [cible]
+            for autre in autres:
+                if autre != extremite and autre in distances:
+                    temporaires[extremite].append((autre, distances[autre]))
+                    temporaires.setdefault(autre, []).append(
+                        (extremite, distances[autre]))
+
+        cout_reel = {source: 0}
+        parent = {source: None}
+        marge = [(distance(depart, arrivee), 0, source)]
+        while True:
+            if not marge:
+                raise ValueError("A*: la grille fournie n'a pas de solution")
+            _, cout_courant, noeud_courant = heapq.heappop(marge)
+            if noeud_courant == cible:
+                break  # on a trouvé un chemin vers la sortie
+            if cout_courant > cout_reel[noeud_courant]:
+                continue  # entrée périmée: un meilleur chemin a été trouvé
+            for voisin, cout in (self.aretes.get(noeud_courant, [])
+                                 + temporaires.get(noeud_courant, [])):
+                cout_voisin = cout_courant + cout
+                if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
+                    continue  # on a un meilleur chemin pour arriver à ce voisin
+                cout_reel[voisin] = cout_voisin
+                parent[voisin] = noeud_courant
+                heapq.heappush(marge, (cout_voisin
+                                       + distance(plate.cellule(voisin),
+                                                  arrivee),
+                                       cout_voisin, voisin))
+
+        # raffiner le chemin abstrait, cluster par cluster
+        abstrait = [cible]
+        while parent[abstrait[-1]] is not None:
+            abstrait.append(parent[abstrait[-1]])
+        abstrait.reverse()
+        chemin = [source]
+        for noeud1, noeud2 in zip(abstrait, abstrait[1:]):
+            chemin.extend(self.raffiner(noeud1, noeud2)[1:])
+        return [plate.cellule(etape) for etape in chemin]
+
+
+def graphe_hpa(grid, taille_cluster=16, exact=False):
+    """
+    Retourner le graphe abstrait de grid, construit une seule fois.
+
+    Le graphe est reconstruit si le labyrinthe a été modifié depuis.
+    """
+    graphes = _CACHE.setdefault(grid, {})
+    graphe = graphes.get((taille_cluster, exact))
+    if graphe is None or graphe.version != grid.version:
+        graphe = graphes[taille_cluster, exact] = GrapheHPA(
+            grid, taille_cluster, exact)
+    return graphe
+
+
+def astar(grid, distance=manhattan_distance, taille_cluster=16, exact=False):
+    """
+    Exécuter HPA* et retourner un chemin de grid.start à grid.out.
+
+    Même interface que solveur_astar_v3.astar (sans visualisation), plus le
+    choix de la taille des clusters et du mode exact (chemin optimal) ou
+    quasi-optimal. Le graphe abstrait est construit au premier appel pour
+    un labyrinthe et des paramètres donnés, puis réutilisé.
+    """
+    out = grid.sortie_unique()
+    graphe = graphe_hpa(grid, taille_cluster, exact)
+    return iter(graphe.chemin(grid.start, out, distance))
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(astar(maze, distance=manhattan_distance, taille_cluster=5)))
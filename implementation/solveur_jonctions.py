@@ -0,0 +1,196 @@
+"""
+Solveur A* sur le graphe des jonctions d'un labyrinthe.
+
+Dans un labyrinthe, la plupart des cellules sont dans des couloirs: elles
+ont exactement deux voisins ouverts, et A* dépense une opération de queue
+pour chacune sans qu'aucun choix ne soit possible. On contracte donc chaque
+couloir en une seule arête pondérée par sa longueur, entre deux "jonctions"
+(cellules ouvertes ayant 0, 1, 3 ou 4 voisins ouverts: carrefours et
+culs-de-sac).
+
+Ce graphe contracté ne dépend que du labyrinthe: il est gardé en cache par
+labyrinthe, et chaque requête y ajoute seulement des arêtes temporaires pour
+son départ et son arrivée quand ceux-ci sont au milieu d'un couloir. A*
+travaille alors sur ce graphe beaucoup plus petit, et le chemin trouvé est
+ensuite redéployé cellule par cellule.
+
+Author: Dalker
+Date: 2021.06.08
+"""
+
+import heapq
+import weakref
+
+import numpy as np
+
+import labyrinthe
+from solveur_astar_v3 import manhattan_distance
+
+_CACHE = weakref.WeakKeyDictionary()  # labyrinthe -> GrapheJonctions
+
+
+class GrapheJonctions():
+    """
+    Graphe des jonctions d'un labyrinthe, couloirs contractés en arêtes.
+
+    Attributs:
+    - plate: labyrinthe.GrillePlate du labyrinthe
+    - version: version du labyrinthe pour laquelle le graphe a été construit
+    - degres: bytes, nombre de voisins ouverts de chaque cellule ouverte
+    - aretes: association jonction -> liste de tuples (voisin, longueur,
+              direction), où direction est le décalage du premier pas depuis
+              la jonction vers le couloir menant à voisin
+    """
+
+    def __init__(self, grid):
+        """Contracter tous les couloirs du labyrinthe."""
+        self.plate = labyrinthe.GrillePlate(grid)
+        self.version = grid.version
+        cases = np.frombuffer(self.plate.cases, dtype=np.uint8).reshape(
+            self.plate.n_rows, self.plate.n_cols)
+        degres = np.zeros_like(cases)
+        degres[1:-1, 1:-1] = (cases[:-2, 1:-1] + cases[2:, 1:-1]
+                              + cases[1:-1, :-2] + cases[1:-1, 2:])
+        degres *= cases
+        self.degres = degres.tobytes()
+        jonctions = np.flatnonzero(cases.ravel() & (degres.ravel() != 2))
+        self.aretes = {}
+        for jonction in jonctions.tolist():
+            self.aretes[jonction] = []
+            for direction in self.plate.directions:
+                if not self.plate.cases[jonction + direction]:
+                    continue
+                fin = self.longer(jonction, direction)
+                if fin is not None:
+                    self.aretes[jonction].append(fin[:2] + (direction,))
+
+    def longer(self, depart, direction, arrets=()):
+        """
+        Suivre un couloir depuis depart dans la direction donnée.
+
+        Le couloir est suivi jusqu'à la première jonction ou cellule de
+        arrets rencontrée, la fin. On retourne un tuple (fin, longueur,
+        retour), où retour est le décalage du premier pas depuis la fin pour
+        revenir par le même couloir, ou None si le couloir revient à depart
+        sans rencontrer de jonction.
+        """
+        cases, degres = self.plate.cases, self.degres
+        directions = self.plate.directions
+        precedent, courant, longueur = depart, depart + direction, 1
+        while degres[courant] == 2 and courant not in arrets:
+            for direction in directions:
+                suivant = courant + direction
+                if cases[suivant] and suivant != precedent:
+                    break
+            precedent, courant = courant, suivant
+            longueur += 1
+            if courant == depart:
+                return None
+        return courant, longueur, precedent - courant
+
+    def cellules(self, depart, direction, fin):
+        """Retourner les indices du couloir de depart (exclu) à fin (inclus)."""
+        cases, directions = self.plate.cases, self.plate.directions
+        precedent, courant = depart, depart + direction
+        couloir = [courant]
+        while courant != fin:
+            for direction in directions:
+                suivant = courant + direction
+                if cases[suivant] and suivant != precedent:
+                    break
+            precedent, courant = courant, suivant
+            couloir.append(courant)
+        return couloir
+
+    def chemin(self, depart, arrivee, distance=manhattan_distance):
+        """
+        Retourner la liste des cellules d'un plus court chemin.
+
+        A* est exécuté sur le graphe des jonctions, complété par des arêtes
+        temporaires reliant depart et arrivee aux jonctions (ou l'un à
+        l'autre) quand ils se trouvent dans un couloir. Lève ValueError s'il
+        n'y a pas de solution.
+        """
+        plate = self.plate
+        source = plate.indice(depart)
+        cible = plate.indice(arrivee)
+        if source == cible:
+            return [depart]
+        # arêtes temporaires (dans les deux sens) pour les extrémités situées
+        # dans un couloir
+        temporaires = {}
+        for extremite in (source, cible):
+            if extremite in self.aretes:
+                continue  # déjà une jonction
+            for direction in plate.directions:
+                if not plate.cases[extremite + direction]:
+                    continue
+                fin = self.longer(extremite, direction, (source, cible))
+                if fin is None:
+                    continue
+                fin, longueur, retour = fin
+                temporaires.setdefault(extremite, []).append(
+                    (fin, longueur, direction))
+                if fin in self.aretes:
+                    temporaires.setdefault(fin, []).append(
+                        (extremite, longueur, retour))
+
+        cout_reel = {source: 0}
+        parent = {source: None}
+        marge = [(distance(depart, arrivee), 0, source)]
+        while True:
+            if not marge:
+                raise ValueError("A*: la grille fournie n'a pas de solution")
+            _, cout_courant, noeud_courant = heapq.heappop(marge)
+            if noeud_courant == cible:
+                break  # on a trouvé un chemin optimal vers la sortie
+            if cout_courant > cout_reel[noeud_courant]:
+                continue  # entrée périmée: un meilleur chemin a été trouvé
+            for voisin, longueur, direction in (
+                    self.aretes.get(noeud_courant, [])
+                    + temporaires.get(noeud_courant, [])):
+                cout_voisin = cout_courant + longueur
+                if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
+                    continue  # on a un meilleur chemin pour arriver à ce voisin
+                cout_reel[voisin] = cout_voisin
+                parent[voisin] = (noeud_courant, direction)
+                heapq.heappush(marge, (cout_voisin
+                                       + distance(plate.cellule(voisin),
+                                                  arrivee),
+                                       cout_voisin, voisin))
+
+        # redéployer les couloirs du chemin trouvé
+        aretes = []
+        etape = cible
+        while parent[etape] is not None:
+            precedent, direction = parent[etape]
+            aretes.append((precedent, direction, etape))
+            etape = precedent
+        chemin = [source]
+        for precedent, direction, etape in reversed(aretes):
+            chemin.extend(self.cellules(precedent, direction, etape))
+        return [plate.cellule(etape) for etape in chemin]
+
+
+def graphe_jonctions(grid):
+    """
+    Retourner le graphe des jonctions de grid, construit une seule fois.
+
+    Le graphe est reconstruit si le labyrinthe a été modifié depuis.
+    """
+    graphe = _CACHE.get(grid)
+    if graphe is None or graphe.version != grid.version:
+        graphe = _CACHE[grid] = GrapheJonctions(grid)
+    return graphe
+
+
+def astar(grid, distance=manhattan_distance):
+    """
+    Exécuter A* sur le graphe des jonctions et retourner le chemin optimal.
+
+    Même interface que solveur_astar_v3.astar (sans visualisation). Le
+    graphe des jonctions est construit au premier appel pour un labyrinthe
+    donné, puis réutilisé.
+    """
+    out = grid.sortie_unique()
+    return iter(graphe_jonctions(grid).chemin(grid.start, out, distance))
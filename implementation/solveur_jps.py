@@ -0,0 +1,161 @@
+"""
+Solveur "Jump Point Search" (JPS) pour labyrinthes à 4 directions.
+
+Dans un labyrinthe très ouvert (destruction_murs élevée), il existe de
+nombreux chemins optimaux symétriques et A* développe de grands "plateaux"
+de noeuds de même priorité. JPS élimine ces symétries: depuis un noeud, on
+"saute" en ligne droite sans ajouter les cellules intermédiaires à la marge,
+jusqu'à un point de saut, c'est-à-dire une cellule où un changement de
+direction peut être nécessaire pour un chemin optimal:
+- en horizontal: la sortie, ou une cellule ayant un voisin "forcé" (ouvert
+  au-dessus ou au-dessous alors qu'il était fermé pour la cellule
+  précédente)
+- en vertical: idem, ou une cellule depuis laquelle un saut horizontal
+  trouve un point de saut
+
+A* ne travaille alors que sur les points de saut, et le chemin est ensuite
+complété cellule par cellule entre points de saut successifs, qui sont
+toujours alignés.
+
+Même interface que solveur_astar_v3: astar(grid, distance=...).
+
+Author: Dalker
+Date: 2021.06.06
+"""
+
+import heapq
+
+import labyrinthe
+from solveur_astar_v3 import manhattan_distance
+
+
+def saut_horizontal(cases, noeud, direction, lateraux, arrivee):
+    """
+    Sauter horizontalement depuis noeud, retourner le point de saut ou None.
+
+    Entrées:
+    - cases: bytes de la labyrinthe.GrillePlate
+    - noeud, arrivee: indices plats
+    - direction: décalage horizontal (1 ou -1)
+    - lateraux: décalages verticaux (n_cols, -n_cols)
+    """
+    while True:
+        noeud += direction
+        if not cases[noeud]:
+            return None  # cul-de-sac
+        if noeud == arrivee:
+            return noeud
+        for lateral in lateraux:
+            if cases[noeud + lateral] and not cases[noeud - direction
+                                                    + lateral]:
+                return noeud  # voisin forcé
+
+
+def saut_vertical(cases, noeud, direction, arrivee):
+    """
+    Sauter verticalement depuis noeud, retourner le point de saut ou None.
+
+    Entrées: comme saut_horizontal, avec direction = n_cols ou -n_cols
+    """
+    lateraux = (direction, -direction)
+    while True:
+        noeud += direction
+        if not cases[noeud]:
+            return None  # cul-de-sac
+        if noeud == arrivee:
+            return noeud
+        for lateral in (1, -1):
+            if cases[noeud + lateral] and not cases[noeud - direction
+                                                    + lateral]:
+                return noeud  # voisin forcé
+        for lateral in (1, -1):
+            if (cases[noeud + lateral] and
+                    saut_horizontal(cases, noeud, lateral, lateraux,
+                                    arrivee) is not None):
+                return noeud  # un saut horizontal mène quelque part
+
+
+def directions_successeurs(plate, noeud, parent):
+    """
+    Retourner les directions à explorer depuis noeud atteint depuis parent.
+
+    On ne revient jamais en arrière; le départ explore les 4 directions.
+    """
+    if parent is None:
+        return plate.directions
+    if noeud // plate.n_cols == parent // plate.n_cols:  # mouvement horizontal
+        direction = 1 if noeud > parent else -1
+        return (direction, plate.n_cols, -plate.n_cols)
+    direction = plate.n_cols if noeud > parent else -plate.n_cols
+    return (direction, 1, -1)
+
+
+def astar(grid, distance=manhattan_distance):
+    """
+    Exécuter A* sur les points de saut et retourner le chemin optimal.
+
+    Les structures sont celles de solveur_astar_v3 (marge en heapq,
+    cout_reel et parent en dict), mais indexées par indices plats de
+    labyrinthe.GrillePlate et limitées aux points de saut. Le chemin
+    retourné contient toutes les cellules, de grid.start à grid.out.
+    """
+    out = grid.sortie_unique()
+    if not grid.connectes(grid.start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    plate = labyrinthe.GrillePlate(grid)
+    cases = plate.cases
+    n_cols = plate.n_cols
+    depart = plate.indice(grid.start)
+    arrivee = plate.indice(out)
+
+    marge = [(distance(grid.start, out), depart)]
+    cout_reel = {depart: 0}
+    parent = {depart: None}
+
+    while True:
+        if not marge:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        priorite, noeud_courant = heapq.heappop(marge)
+        if noeud_courant == arrivee:
+            break  # on a trouvé un chemin optimal vers la sortie
+        cout_courant = cout_reel[noeud_courant]
+        if priorite > cout_courant + distance(plate.cellule(noeud_courant),
+                                              out):
+            continue  # entrée périmée: un meilleur chemin a été trouvé depuis
+        for direction in directions_successeurs(plate, noeud_courant,
+                                                parent[noeud_courant]):
+            if direction in (1, -1):
+                voisin = saut_horizontal(cases, noeud_courant, direction,
+                                         (n_cols, -n_cols), arrivee)
+            else:
+                voisin = saut_vertical(cases, noeud_courant, direction,
+                                       arrivee)
+            if voisin is None:
+                continue  # rien d'intéressant dans cette direction
+            cout_voisin = cout_courant + abs(voisin - noeud_courant) // abs(
+                direction)
+            if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
+                continue  # on a un meilleur chemin pour arriver à ce voisin
+            cout_reel[voisin] = cout_voisin
+            parent[voisin] = noeud_courant
+            heapq.heappush(marge, (cout_voisin
+                                   + distance(plate.cellule(voisin), out),
+                                   voisin))
+
+    # compléter le chemin entre points de saut successifs
+    chemin = [arrivee]
+    while parent[chemin[-1]] is not None:
+        etape, precedent = chemin[-1], parent[chemin[-1]]
+        if etape // n_cols == precedent // n_cols:
+            pas = 1 if precedent > etape else -1
+        else:
+            pas = n_cols if precedent > etape else -n_cols
+        chemin.extend(range(etape + pas, precedent + pas, pas))
+    return reversed([plate.cellule(etape) for etape in chemin])
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(astar(maze, distance=manhattan_distance)))
@@ -0,0 +1,167 @@
+"""
+Solveur incrémental LPA* (Lifelong Planning A*).
+
+Lorsque des murs d'un labyrinthe sont ouverts ou fermés après sa génération
+(Maze.set_passable, destruction de murs...), relancer A* depuis zéro refait
+toute la recherche. Un objet PlanificateurLPA conserve au contraire son état
+de recherche d'un appel à l'autre:
+- g: coût du meilleur chemin connu depuis le départ, pour chaque cellule
+- rhs: coût "prévu" d'après les voisins, min(g(voisin) + 1)
+Une cellule est "incohérente" quand g != rhs; seules ces cellules sont
+placées dans la queue prioritaire. Après un changement de murs, on recalcule
+rhs uniquement pour les cellules touchées et leurs voisins, puis replan()
+ne réexamine que la partie de la recherche affectée par ces changements.
+
+Le départ et la sortie restent ceux de la grille (grid.start, grid.out);
+l'heuristique doit être cohérente (c'est le cas de la distance de Manhattan
+et de la distance nulle).
+
+Author: Dalker
+Date: 2021.06.10
+"""
+
+import heapq
+import math
+
+from solveur_astar_v3 import manhattan_distance
+
+
+class PlanificateurLPA():
+    """
+    État de recherche LPA* d'un labyrinthe dont les murs peuvent changer.
+
+    Attributs:
+    - grid: le labyrinthe
+    - out: l'unique sortie du labyrinthe
+    - distance: heuristique (cohérente) entre deux cellules
+    - g: association cellule -> coût du meilleur chemin trouvé depuis start
+    - rhs: association cellule -> coût prévu d'après les voisins
+    - queue: heapq de tuples (clé, cellule), avec entrées périmées
+    - cles: association cellule incohérente -> sa clé actuelle dans queue
+    """
+
+    def __init__(self, grid, distance=manhattan_distance):
+        """Initialiser la recherche; le premier replan() fait un A* complet."""
+        self.grid = grid
+        self.out = grid.sortie_unique()
+        self.distance = distance
+        self.n_rows, self.n_cols = grid.matrice().shape
+        self.g = {}
+        self.rhs = {grid.start: 0}
+        self.queue = []
+        self.cles = {}
+        self._inserer(grid.start)
+
+    def _cle(self, cell):
+        """Retourner la clé de priorité d'une cellule."""
+        cout = min(self.g.get(cell, math.inf), self.rhs.get(cell, math.inf))
+        return (cout + self.distance(cell, self.out), cout)
+
+    def _inserer(self, cell):
+        """Placer (ou replacer) une cellule dans la queue."""
+        cle = self._cle(cell)
+        self.cles[cell] = cle
+        heapq.heappush(self.queue, (cle, cell))
+
+    def _voisins_positionnels(self, cell):
+        """Retourner les 4 cellules adjacentes à cell dans les limites."""
+        row, col = cell
+        return [(row2, col2) for row2, col2 in ((row, col + 1), (row + 1, col),
+                                                (row, col - 1), (row - 1, col))
+                if 0 <= row2 < self.n_rows and 0 <= col2 < self.n_cols]
+
+    def _mettre_a_jour(self, cell):
+        """Recalculer rhs d'une cellule et sa place dans la queue."""
+        grid = self.grid
+        if cell not in grid:
+            rhs = math.inf
+        elif cell == grid.start:
+            rhs = 0
+        else:
+            g = self.g
+            rhs = min((g.get(voisin, math.inf)
+                       for voisin in grid.neighbours(cell)),
+                      default=math.inf) + 1
+        if rhs == math.inf:
+            self.rhs.pop(cell, None)
+        else:
+            self.rhs[cell] = rhs
+        self.cles.pop(cell, None)  # l'entrée de la queue devient périmée
+        if self.g.get(cell, math.inf) != rhs:
+            self._inserer(cell)
+
+    def update_cells(self, changed_cells):
+        """
+        Prendre en compte des cellules dont l'état (mur/ouvert) a changé.
+
+        Entrée: itérable de tuples (ligne, colonne), déjà modifiés dans grid.
+        Le chemin n'est recalculé qu'au prochain appel de replan().
+        """
+        a_revoir = set()
+        for cell in changed_cells:
+            a_revoir.add(cell)
+            a_revoir.update(self._voisins_positionnels(cell))
+        for cell in a_revoir:
+            self._mettre_a_jour(cell)
+
+    def replan(self):
+        """
+        Réparer la recherche et retourner la liste des cellules du chemin.
+
+        Lève ValueError s'il n'y a pas de solution.
+        """
+        grid, g, rhs, queue, cles = (self.grid, self.g, self.rhs,
+                                     self.queue, self.cles)
+        out = self.out
+        while queue:
+            cle, cell = queue[0]
+            if cles.get(cell) != cle:
+                heapq.heappop(queue)  # entrée périmée
+                continue
+            if (cle >= self._cle(out)
+                    and rhs.get(out, math.inf) == g.get(out, math.inf)):
+                break  # la sortie est cohérente et rien de mieux n'attend
+            heapq.heappop(queue)
+            del cles[cell]
+            if g.get(cell, math.inf) > rhs.get(cell, math.inf):
+                g[cell] = rhs[cell]  # sur-cohérente: on fixe son coût
+                for voisin in grid.neighbours(cell):
+                    self._mettre_a_jour(voisin)
+            else:
+                g.pop(cell, None)  # sous-cohérente: on oublie son coût
+                self._mettre_a_jour(cell)
+                for voisin in self._voisins_positionnels(cell):
+                    self._mettre_a_jour(voisin)
+        if g.get(out, math.inf) == math.inf:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        # remonter de la sortie en suivant les coûts décroissants
+        chemin = [out]
+        while chemin[-1] != grid.start:
+            cout = g[chemin[-1]] - 1
+            chemin.append(next(voisin for voisin
+                               in grid.neighbours(chemin[-1])
+                               if g.get(voisin) == cout))
+        chemin.reverse()
+        return chemin
+
+
+def astar(grid, distance=manhattan_distance):
+    """
+    Exécuter LPA* une fois et retourner un chemin de grid.start à grid.out.
+
+    Même interface que solveur_astar_v3.astar (sans visualisation); pour
+    profiter du replanning incrémental, garder un PlanificateurLPA.
+    """
+    return iter(PlanificateurLPA(grid, distance).replan())
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ab import Maze
+    maze = Maze(10, 10, 0)
+    planificateur = PlanificateurLPA(maze)
+    print(maze)
+    print(len(planificateur.replan()))
+    maze.set_passable((2, 3))
+    planificateur.update_cells([(2, 3)])
+    print(len(planificateur.replan()))
@@ -0,0 +1,294 @@
+"""
+Solveurs à mémoire bornée pour très grands labyrinthes.
+
+Les dictionnaires cout_reel et parent de solveur_astar_v3 grandissent avec
+chaque cellule explorée, jusqu'à épuiser la mémoire sur les plus grands
+labyrinthes. Ce module propose deux solveurs dont la mémoire est limitée
+par un paramètre max_memory_nodes, au prix d'un temps de calcul plus long:
+
+- IDA* (Iterative Deepening A*): suite de parcours en profondeur, chacun
+  limité aux noeuds dont coût réel + heuristique ne dépasse pas un seuil,
+  le seuil augmentant d'une itération à l'autre. Seul le chemin courant est
+  gardé en mémoire, plus une table de transposition (cellule -> meilleur
+  coût réel vu pendant l'itération) d'au plus max_memory_nodes entrées,
+  qui évite de réexplorer une cellule déjà atteinte par un chemin plus court.
+
+- SMA* (Simplified Memory-bounded A*): A* qui garde au plus
+  max_memory_nodes noeuds en mémoire. Quand la mémoire est pleine, la
+  feuille la moins prometteuse est oubliée et son parent retient la
+  meilleure priorité de ses enfants oubliés, pour les régénérer si besoin.
+
+Les deux solveurs retournent un chemin optimal (pour SMA*: tant que la
+mémoire permet de garder le chemin optimal) si l'heuristique est admissible
+et cohérente, comme la distance de Manhattan.
+
+Author: Dalker
+Date: 2021.06.12
+"""
+
+import heapq
+import itertools
+import math
+from collections import OrderedDict
+
+from solveur_astar_v3 import manhattan_distance
+
+
+def ida(grid, distance=manhattan_distance, max_memory_nodes=10**6):
+    """
+    Exécuter IDA* et retourner le chemin optimal de grid.start à grid.out.
+
+    La table de transposition est limitée à max_memory_nodes entrées: une
+    fois pleine, chaque nouvelle entrée remplace celle écrite il y a le plus
+    longtemps, de sorte que la table couvre surtout les environs du chemin
+    courant (la recherche reste correcte, mais réexplore davantage). Le
+    chemin courant, lui, est toujours gardé en entier. Une table trop
+    petite fait exploser le nombre de réexplorations: en 2000x2000, IDA*
+    avec 10**5 entrées ne termine pas en 45 minutes (cf.
+    time_test.comparer_memoire), d'où le défaut de 10**6.
+
+    Lève ValueError s'il n'y a pas de solution.
+    """
+    start, out = grid.start, grid.sortie_unique()
+    if not grid.connectes(start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    seuil = distance(start, out)
+    while True:
+        table = OrderedDict({start: 0})  # transpositions de l'itération
+        dans_chemin = {start}
+        pile = [(start, 0, iter(grid.neighbours(start)))]
+        prochain_seuil = math.inf
+        while pile:
+            noeud, cout, voisins = pile[-1]
+            if noeud == out:
+                return iter([etape for etape, _, _ in pile])
+            voisin = next(voisins, None)
+            if voisin is None:  # tous les voisins ont été explorés
+                pile.pop()
+                dans_chemin.discard(noeud)
+                continue
+            if voisin in dans_chemin:
+                continue
+            cout_voisin = cout + 1
+            priorite = cout_voisin + distance(voisin, out)
+            if priorite > seuil:
+                prochain_seuil = min(prochain_seuil, priorite)
+                continue
+            if table.get(voisin, math.inf) <= cout_voisin:
+                continue  # déjà atteint pendant cette itération, moins cher
+            if voisin in table:
+                table.move_to_end(voisin)
+            elif len(table) >= max_memory_nodes:
+                table.popitem(last=False)  # oublier l'entrée la plus ancienne
+            table[voisin] = cout_voisin
+            dans_chemin.add(voisin)
+            pile.append((voisin, cout_voisin, iter(grid.neighbours(voisin))))
+        if prochain_seuil == math.inf:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        seuil = prochain_seuil
+
+
+class NoeudSMA():
+    """
+    Noeud de l'arbre de recherche de SMA*.
+
+    Attributs:
+    - cellule: tuple (ligne, colonne)
+    - cout: coût réel depuis le départ
+    - base: priorité (coût réel + heuristique) à la création du noeud
+    - prochaine: priorité du prochain successeur à générer, enfants oubliés
+                 compris (inf si aucun); pour une feuille, c'est aussi la
+                 priorité retenue par son parent si elle est oubliée
+    - parent: NoeudSMA parent (None pour le départ)
+    - enfants: liste des enfants en mémoire
+    - nouveaux: liste des cellules voisines jamais générées
+    - oublies: association cellule d'un enfant oublié -> sa priorité
+    - vivant: False une fois le noeud oublié
+    - version: estampille de ses entrées valides dans les tas
+    """
+
+    __slots__ = ("cellule", "cout", "base", "prochaine", "parent", "enfants",
+                 "nouveaux", "oublies", "vivant", "version")
+
+    def __init__(self, cellule, cout, base, parent, nouveaux):
+        """Créer un noeud dont aucun voisin n'est encore généré."""
+        self.cellule = cellule
+        self.cout = cout
+        self.base = base
+        self.prochaine = base
+        self.parent = parent
+        self.enfants = []
+        self.nouveaux = list(nouveaux)
+        self.oublies = {}
+        self.vivant = True
+        self.version = 0
+
+    def recalculer(self):
+        """Recalculer la priorité du prochain successeur à générer."""
+        prochaine = min(self.oublies.values(), default=math.inf)
+        if self.nouveaux:
+            prochaine = min(prochaine, self.base)
+        self.prochaine = prochaine
+
+
+def sma(grid, distance=manhattan_distance, max_memory_nodes=100000):
+    """
+    Exécuter SMA* et retourner un chemin de grid.start à grid.out.
+
+    Au plus max_memory_nodes noeuds sont gardés en mémoire. Le chemin est
+    optimal si le chemin optimal tient en mémoire (max_memory_nodes doit
+    dépasser sa longueur), sinon on retourne le meilleur chemin qui tient.
+
+    Le prochain noeud développé est celui dont le prochain successeur a la
+    plus petite priorité; quand la mémoire est pleine, on oublie la feuille
+    dont le prochain successeur a la plus grande priorité.
+
+    Lève ValueError s'il n'y a pas de solution (ou aucune qui tienne en
+    mémoire).
+    """
+    out = grid.sortie_unique()
+    if not grid.connectes(grid.start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    compteur = itertools.count(1)
+    meilleurs = []  # tas de (prochaine, -coût, version, noeud)
+    pires = []  # tas de (-prochaine, coût, version, noeud), pour les feuilles
+
+    def placer(noeud):
+        """(Re)placer un noeud dans les deux tas avec ses priorités."""
+        noeud.version = version = next(compteur)
+        heapq.heappush(meilleurs, (noeud.prochaine, -noeud.cout, version,
+                                   noeud))
+        if not noeud.enfants:
+            heapq.heappush(pires, (-noeud.prochaine, noeud.cout, version,
+                                   noeud))
+
+    def retirer(noeud):
+        """Retirer un noeud de la mémoire et de l'arbre."""
+        noeud.vivant = False
+        if memoire.get(noeud.cellule) is noeud:
+            del memoire[noeud.cellule]
+        if noeud.parent is not None:
+            noeud.parent.enfants.remove(noeud)
+
+    def actualiser(noeud):
+        """
+        Recalculer la priorité d'un noeud et le replacer dans les tas.
+
+        Un noeud devenu une impasse (rien à générer, aucun enfant) est oublié
+        définitivement, et on actualise alors son parent. Retourne le nombre
+        de noeuds oubliés.
+        """
+        n_oublies = 0
+        while (noeud is not None and not noeud.nouveaux
+               and not noeud.oublies and not noeud.enfants
+               and noeud.cellule != out):
+            retirer(noeud)  # impasse
+            n_oublies += 1
+            noeud = noeud.parent
+        if noeud is not None:
+            noeud.recalculer()
+            placer(noeud)
+        return n_oublies
+
+    def oublier(courant):
+        """
+        Oublier la feuille la moins prometteuse (sauf courant et le départ).
+
+        Retourne False s'il n'y avait aucune feuille à oublier.
+        """
+        gardees = []
+        feuille = None
+        while pires:
+            entree = heapq.heappop(pires)
+            candidate = entree[3]
+            if (not candidate.vivant or candidate.version != entree[2]
+                    or candidate.enfants):
+                continue  # entrée périmée
+            if candidate is courant or candidate.parent is None:
+                gardees.append(entree)
+                continue
+            feuille = candidate
+            break
+        for entree in gardees:
+            heapq.heappush(pires, entree)
+        if feuille is None:
+            return False
+        retirer(feuille)
+        parent = feuille.parent
+        parent.oublies[feuille.cellule] = min(
+            parent.oublies.get(feuille.cellule, math.inf), feuille.prochaine)
+        actualiser(parent)
+        return True
+
+    racine = NoeudSMA(grid.start, 0, distance(grid.start, out), None,
+                      grid.neighbours(grid.start))
+    if grid.start != out:
+        racine.recalculer()  # priorité infinie si le départ est muré
+    memoire = {grid.start: racine}  # cellule -> meilleur noeud en mémoire
+    n_noeuds = 1
+    placer(racine)
+    while True:
+        if len(meilleurs) + len(pires) > 3 * n_noeuds + 100:
+            # les entrées périmées gardent en vie des noeuds oubliés:
+            # reconstruire les tas pour que la mémoire reste bornée
+            meilleurs[:] = [entree for entree in meilleurs
+                            if entree[3].vivant
+                            and entree[3].version == entree[2]]
+            pires[:] = [entree for entree in pires
+                        if entree[3].vivant
+                        and entree[3].version == entree[2]
+                        and not entree[3].enfants]
+            heapq.heapify(meilleurs)
+            heapq.heapify(pires)
+        while meilleurs and (not meilleurs[0][3].vivant
+                             or meilleurs[0][3].version != meilleurs[0][2]):
+            heapq.heappop(meilleurs)  # entrée périmée
+        if not meilleurs or meilleurs[0][0] == math.inf:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        noeud = meilleurs[0][3]
+        if noeud.cellule == out:
+            break
+        # générer le prochain successeur du meilleur noeud: un voisin
+        # jamais généré, ou l'enfant oublié le plus prometteur
+        oublie = min(noeud.oublies, key=noeud.oublies.get, default=None)
+        if noeud.nouveaux and (oublie is None
+                               or noeud.base <= noeud.oublies[oublie]):
+            cellule = noeud.nouveaux.pop()
+            priorite = noeud.base
+        else:
+            cellule = oublie
+            priorite = noeud.oublies.pop(oublie)
+        cout = noeud.cout + 1
+        existant = memoire.get(cellule)
+        if ((existant is None or existant.cout > cout)
+                and (cout < max_memory_nodes - 1 or cellule == out)):
+            if n_noeuds < max_memory_nodes:
+                n_noeuds += 1
+                place = True
+            else:
+                place = oublier(noeud)
+            if place:  # sinon la mémoire ne contient que le chemin courant
+                enfant = NoeudSMA(cellule, cout,
+                                  max(priorite, cout + distance(cellule, out)),
+                                  noeud,
+                                  [] if cellule == out
+                                  else grid.neighbours(cellule))
+                noeud.enfants.append(enfant)
+                memoire[cellule] = enfant
+                placer(enfant)
+        n_noeuds -= actualiser(noeud)
+
+    etape = noeud
+    chemin = []
+    while etape is not None:
+        chemin.append(etape.cellule)
+        etape = etape.parent
+    return reversed(chemin)
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    print(list(ida(maze, max_memory_nodes=50)))
+    print(list(sma(maze, max_memory_nodes=50)))
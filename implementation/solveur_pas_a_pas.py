@@ -4,8 +4,8 @@ Solveur A* 3ème version après d'autres lectures.
 Ce module fournit un solveur qui s'attend à travailler sur une
 grille rectangulaire fournie comme un objet avec des attributs
 start et out (tuples de coordonnée de départ et arrivée du
-labyrinthe) et une métode __contains__ permettant de vérifier
-si un tuple de coordonnées est accessible dans la grille.
+labyrinthe) et une métode neighbours retournant les voisins
+accessibles d'un tuple de coordonnées dans la grille.
 
 Cette version permet d'avancer pas à pas dans le but de visualiser
 la progression de l'algorithme.
@@ -14,6 +14,7 @@ Author: Dalker
 Date: 2021.05.21
 """
 
+from etat_recherche import EtatRecherche
 from solveur_astar_v3 import manhattan_distance
 from solveur_astar_v3 import QueuePrioritaire
 
@@ -24,9 +25,12 @@ class Astar():
 
     Attributs:
     - grid: la grille à résoudre (consultable avec grid.start, grid.out,
-            foo in grille)
-    - marge, cout_reel, parent: structures de l'algorithme A*
-      (cf. module solveur_astar_v3)
+            grid.neighbours(foo))
+    - marge, cout_reel: structures de l'algorithme A*
+      (cf. module solveur_astar_v3); cout_reel est un
+      etat_recherche.EtatRecherche des noeuds vus et fermés, qui garde
+      aussi les parents
+    - out: l'unique sortie de la grille
     - etape, chemin: données pour le backtrack
     """
 
@@ -35,11 +39,10 @@ class Astar():
         self.grid = grid
         self.distance = distance
         # structures de donnée pour recherche A*
-        self.marge = QueuePrioritaire(grid.start)
-        self.cout_reel = {grid.start: 0}
-        self.parent = {grid.start: None}
+        self.marge = QueuePrioritaire((grid.start, 0, None))
+        self.cout_reel = EtatRecherche(grid, grid.start)
         # structures de donnée pour backtracking
-        self.etape = self.grid.out
+        self.etape = self.out = grid.sortie_unique()
         self.chemin = []
         # état de départ
         self.etat = "recherche"  # passera ensuite à "backtrack" et "fini"
@@ -56,27 +59,24 @@ class Astar():
 
     def recherche(self):
         """Exécuter un pas de recherche."""
-        noeud_courant = self.marge.pop()
-        if noeud_courant is None:
+        entree = self.marge.pop()
+        if entree is None:
             raise ValueError("A*: la grille fournie n'a pas de solution")
-        if noeud_courant == self.grid.out:
+        noeud_courant, cout_courant, predecesseur = entree
+        if not self.cout_reel.fermer(noeud_courant, predecesseur):
+            return  # entrée périmée: noeud déjà fermé par meilleur chemin
+        if noeud_courant == self.out:
             self.etat = "backtrack"  # on a trouvé un chemin optimal
             return
         # après ces vérifications, on fait un vrai pas de A*
-        for direction in ((0, 1), (1, 0), (0, -1), (-1, 0)):
-            # calculer coordonnées d'un voisin potentiel
-            voisin = tuple([noeud_courant[i] + direction[i] for i in (0, 1)])
-            if voisin not in self.grid:
-                continue  # on ne peut pas accéder à ces coordonnées
-            cout_voisin = self.cout_reel[noeud_courant] + 1
-            if (voisin in self.cout_reel
-                    and cout_voisin >= self.cout_reel[voisin]):
-                continue  # on a un meilleur chemin pour arriver à ce voisin
+        cout_voisin = cout_courant + 1
+        for voisin in self.grid.neighbours(noeud_courant):
+            if not self.cout_reel.ouvrir(voisin):
+                continue  # on a déjà le meilleur chemin vers ce voisin
             # on est arrivé jusqu'ici: ajouter le voisin à la marge
-            self.cout_reel[voisin] = cout_voisin
-            self.parent[voisin] = noeud_courant
-            heuristique = cout_voisin + self.distance(voisin, self.grid.out)
-            self.marge.insert(heuristique, voisin)
+            heuristique = cout_voisin + self.distance(voisin, self.out)
+            self.marge.insert(heuristique,
+                              (voisin, cout_voisin, noeud_courant))
 
     def backtrack(self):
         """Faire un pas de backtracking."""
@@ -84,7 +84,7 @@ class Astar():
             self.etat = "fini"
             return
         self.chemin.append(self.etape)
-        self.etape = self.parent[self.etape]
+        self.etape = self.cout_reel.parent(self.etape)
 
 
 if __name__ == "__main__":
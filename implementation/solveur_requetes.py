@@ -0,0 +1,86 @@
+"""
+Résolution groupée de nombreuses requêtes de chemin sur un même labyrinthe.
+
+astar(grid) ne traite qu'une paire (grid.start, grid.out) lue dans le
+labyrinthe lui-même. solve_many(grid, queries) reçoit au contraire un
+itérable de paires (départ, arrivée) et regroupe les requêtes:
+- celles qui partagent une arrivée sont servies par un seul arbre des plus
+  courts chemins vers cette arrivée (cache_sortie.ArbreSortie)
+- celles qui partagent un départ par un seul arbre enraciné au départ, dont
+  on lit les chemins à l'envers (les déplacements sont réversibles)
+- les requêtes isolées par solveur_astar_v4, sur une même GrillePlate
+
+Author: Dalker
+Date: 2021.06.16
+"""
+
+import collections
+
+import labyrinthe
+from cache_sortie import ArbreSortie
+from solveur_astar_v3 import manhattan_distance
+import solveur_astar_v4
+
+VERS_ARRIVEE, DEPUIS_DEPART = 0, 1  # sens de lecture d'un arbre
+
+
+def solve_many(grid, queries, distance=manhattan_distance):
+    """
+    Générer les chemins d'une série de requêtes, dans l'ordre des requêtes.
+
+    Entrées:
+    - grid: labyrinthe
+    - queries: itérable de paires (départ, arrivée) de tuples (ligne, colonne)
+    - distance: heuristique pour les requêtes isolées
+    Sortie: générateur de listes de cellules, None pour une requête sans
+            solution
+
+    Les requêtes sont lues entièrement avant la première réponse, pour
+    pouvoir les regrouper; un arbre n'est gardé en mémoire que jusqu'à la
+    dernière requête de son groupe.
+    """
+    requetes = [(tuple(depart), tuple(arrivee)) for depart, arrivee in queries]
+    par_arrivee = collections.Counter(arrivee for _, arrivee in requetes)
+    par_depart = collections.Counter(depart for depart, _ in requetes)
+    groupes = []
+    for depart, arrivee in requetes:
+        if par_arrivee[arrivee] > 1 and (par_arrivee[arrivee]
+                                         >= par_depart[depart]):
+            groupes.append((VERS_ARRIVEE, arrivee))
+        elif par_depart[depart] > 1:
+            groupes.append((DEPUIS_DEPART, depart))
+        else:
+            groupes.append(None)  # requête isolée
+    restantes = collections.Counter(groupes)
+    arbres = {}
+    plate = None
+    for (depart, arrivee), groupe in zip(requetes, groupes):
+        try:
+            if groupe is None:
+                if plate is None:
+                    plate = labyrinthe.GrillePlate(grid)
+                chemin = list(solveur_astar_v4.astar(grid, distance, depart,
+                                                     arrivee, plate))
+            else:
+                sens, racine = groupe
+                if groupe not in arbres:
+                    arbres[groupe] = ArbreSortie(grid, (racine,))
+                if sens == VERS_ARRIVEE:
+                    chemin = arbres[groupe].chemin(depart)
+                else:
+                    chemin = arbres[groupe].chemin(arrivee)[::-1]
+                restantes[groupe] -= 1
+                if not restantes[groupe]:
+                    del arbres[groupe]
+        except ValueError:  # pas de solution pour cette requête
+            chemin = None
+        yield chemin
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import MAZE10 as maze
+    print(maze)
+    requetes = [((1, 1), (19, 20)), ((3, 1), (19, 20)), ((1, 1), (5, 5))]
+    for requete, chemin in zip(requetes, solve_many(maze, requetes)):
+        print(requete, chemin)
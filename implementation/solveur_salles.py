@@ -0,0 +1,136 @@
+"""
+Solveur A* sur le graphe des rooms d'un generateur_ab.Maze.
+
+Un Maze de room_rows x room_cols rooms occupe une grille de cellules
+(2 * room_rows + 1) x (2 * room_cols + 1): une cellule sur quatre seulement
+est une room, les autres sont des murs ou des connecteurs entre deux rooms.
+Tant que les piliers restent fermés (cf. Maze.graphe_salles_exact), chercher
+parmi les rooms suffit: chaque passage ouvert relie deux rooms voisines, pour
+un coût de 2 cellules. On divise ainsi par 4 environ le nombre de noeuds, les
+entrées de la marge et la mémoire de la recherche, et on ne repasse aux
+coordonnées des cellules que pour construire le chemin retourné.
+
+Les rooms sont des indices plats ligne * room_cols + colonne, et la recherche
+reprend la structure de solveur_astar_v4 (array.array préalloués, marge en
+heapq d'entiers). Les coûts et l'heuristique restent comptés en cellules, ce
+qui garde admissible la distance de Manhattan entre cellules.
+
+Si le labyrinthe n'a pas de graphe des rooms exact (autre générateur, piliers
+ouverts par destr_murs, départ ou arrivée hors d'une room), on se rabat sur
+solveur_astar_v4.
+
+Author: Dalker
+Date: 2021.06.18
+"""
+
+import array
+import heapq
+
+import numpy as np
+
+from generateur_ab import DROITE, BAS, GAUCHE, HAUT
+import solveur_astar_v4
+from solveur_astar_v3 import manhattan_distance, null_distance
+
+
+def est_salle(cell):
+    """La cellule (ligne, colonne) est-elle une room du graphe?"""
+    return cell[0] % 2 == 1 and cell[1] % 2 == 1
+
+
+def heuristiques(room_rows, room_cols, out, distance):
+    """
+    Précalculer l'heuristique (en cellules) de chaque room vers la sortie.
+
+    Comme solveur_astar_v4.heuristiques: vectorisé pour les distances nulle
+    et Manhattan, rempli de -1 (à compléter à la demande) sinon.
+    """
+    if distance is null_distance:
+        return array.array("i", bytes(4 * room_rows * room_cols))
+    if distance is manhattan_distance:
+        rows = np.abs(2 * np.arange(room_rows) + 1 - out[0])
+        cols = np.abs(2 * np.arange(room_cols) + 1 - out[1])
+        valeurs = (rows[:, np.newaxis] + cols).astype(np.int32)
+        return array.array("i", valeurs.tobytes())
+    return array.array("i", [-1]) * (room_rows * room_cols)
+
+
+def astar(grid, distance=manhattan_distance):
+    """
+    Exécuter l'Algorithme A* sur les rooms et retourner le chemin optimal.
+
+    Même interface et même format de sortie que solveur_astar_v4.astar: le
+    chemin retourné passe par toutes les cellules, connecteurs compris.
+    """
+    out = grid.sortie_unique()
+    if not (hasattr(grid, "masque_salles") and est_salle(grid.start)
+            and est_salle(out) and grid.graphe_salles_exact()):
+        return solveur_astar_v4.astar(grid, distance)
+    if not grid.connectes(grid.start, out):
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    room_cols = grid.room_cols
+    masques = grid.masque_salles().tobytes()
+    taille = len(masques)
+    decalages = tuple(tuple(decalage for bit, decalage
+                            in ((DROITE, 1), (BAS, room_cols),
+                                (GAUCHE, -1), (HAUT, -room_cols))
+                            if masque & bit)
+                      for masque in range(16))
+    source = (grid.start[0] // 2) * room_cols + grid.start[1] // 2
+    cible = (out[0] // 2) * room_cols + out[1] // 2
+    heuristique = heuristiques(grid.room_rows, room_cols, out, distance)
+
+    def cellule(salle):
+        """Retourner les coordonnées (ligne, colonne) de la room."""
+        row, col = divmod(salle, room_cols)
+        return (2 * row + 1, 2 * col + 1)
+
+    if heuristique[source] < 0:
+        heuristique[source] = distance(grid.start, out)
+    cout_reel = array.array("i", [-1]) * taille
+    parent = array.array("i", [-1]) * taille
+    cout_reel[source] = 0
+    marge = [heuristique[source] * taille + source]
+    heappush, heappop = heapq.heappush, heapq.heappop  # accès locaux rapides
+
+    while True:
+        if not marge:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        priorite, noeud_courant = divmod(heappop(marge), taille)
+        if noeud_courant == cible:
+            break  # on a trouvé un chemin optimal vers la sortie
+        cout_voisin = cout_reel[noeud_courant]
+        if cout_voisin + heuristique[noeud_courant] != priorite:
+            continue  # entrée périmée: un meilleur chemin a été trouvé depuis
+        cout_voisin += 2  # une room plus loin: connecteur puis room
+        for decalage in decalages[masques[noeud_courant]]:
+            voisin = noeud_courant + decalage
+            if 0 <= cout_reel[voisin] <= cout_voisin:
+                continue  # on a un meilleur chemin pour arriver à ce voisin
+            cout_reel[voisin] = cout_voisin
+            parent[voisin] = noeud_courant
+            estimation = heuristique[voisin]
+            if estimation < 0:
+                estimation = distance(cellule(voisin), out)
+                heuristique[voisin] = estimation
+            heappush(marge, (cout_voisin + estimation) * taille + voisin)
+
+    # on est arrivé jusqu'ici: reconstruire le chemin en cellules, en
+    # intercalant le connecteur entre chaque room et son parent
+    etape = cible
+    chemin = [out]
+    while parent[etape] != -1:
+        row, col = cellule(etape)
+        row_parent, col_parent = cellule(parent[etape])
+        chemin.append(((row + row_parent) // 2, (col + col_parent) // 2))
+        chemin.append((row_parent, col_parent))
+        etape = parent[etape]
+    return reversed(chemin)
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ab import Maze
+    maze = Maze(10, 10)
+    print(maze)
+    print(list(astar(maze, distance=manhattan_distance)))
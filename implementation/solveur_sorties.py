@@ -0,0 +1,94 @@
+"""
+Solveur A* vers la plus proche de plusieurs sorties.
+
+Un labyrinthe peut avoir plusieurs sorties (grid.out est alors une collection
+de cellules, cf. labyrinthe.Labyrinthe.sorties). Plutôt que de lancer une
+recherche par sortie et de garder la plus courte, on fait une seule recherche
+A* qui s'arrête à la première sortie atteinte, avec comme heuristique le
+minimum des distances aux sorties. Ce minimum d'heuristiques admissibles et
+cohérentes l'est aussi: la première sortie développée est donc la plus
+proche, par un chemin optimal.
+
+Pour obtenir d'un coup le chemin vers la sortie la plus proche depuis tous
+les départs, voir plutôt champ_distances (parcours en largeur lancé depuis
+toutes les sorties à la fois).
+
+Author: Dalker
+Date: 2021.06.17
+"""
+
+from solveur_astar_v3 import manhattan_distance, QueuePrioritaire, QueueSeaux
+from viewer import AstarView
+
+
+def astar(grid, distance=manhattan_distance, view=None, queue=None):
+    """
+    Exécuter A* et retourner le chemin optimal vers la sortie la plus proche.
+
+    Même interface que solveur_astar_v3.astar, cf. la documentation de ce
+    dernier; grid.out peut être une cellule ou une collection de cellules.
+    Le dernier élément du chemin retourné est la sortie atteinte.
+    """
+    sorties = [sortie for sortie in grid.sorties()
+               if grid.connectes(grid.start, sortie)]
+    if not sorties:
+        raise ValueError("A*: la grille fournie n'a pas de solution")
+    arrivees = set(sorties)
+
+    def heuristique(noeud):
+        """Retourner la distance estimée à la sortie la plus proche."""
+        return min(distance(noeud, sortie) for sortie in sorties)
+
+    if queue is None:
+        if isinstance(heuristique(grid.start), int):
+            queue = QueueSeaux
+        else:
+            queue = QueuePrioritaire
+    marge = queue(grid.start)
+    cout_reel = {grid.start: 0}
+    parent = {grid.start: None}
+
+    if view is not None:
+        viewer = AstarView(grid, marge, cout_reel, view)
+
+    while True:
+        if view is not None:
+            viewer.update()
+        noeud_courant = marge.pop()
+        if noeud_courant is None:
+            raise ValueError("A*: la grille fournie n'a pas de solution")
+        if noeud_courant in arrivees:
+            break  # on a trouvé un chemin optimal vers la sortie
+        for voisin in grid.neighbours(noeud_courant):
+            cout_voisin = cout_reel[noeud_courant] + 1
+            if voisin in cout_reel and cout_voisin >= cout_reel[voisin]:
+                continue  # on a un meilleur chemin pour arriver à ce voisin
+            # on est arrivé jusqu'ici: ajouter le voisin à la marge
+            cout_reel[voisin] = cout_voisin
+            parent[voisin] = noeud_courant
+            marge.insert(cout_voisin + heuristique(voisin), voisin)
+
+    # on est arrivé jusqu'ici: le chemin optimal a été trouvé
+    etape = noeud_courant
+    chemin = []
+    while etape is not None:
+        chemin.append(etape)
+        etape = parent[etape]
+    if view is not None:
+        viewer.showpath(chemin)
+    return reversed(chemin)
+
+
+if __name__ == "__main__":
+    # test minimal
+    from generateur_ascii import LabyrintheAscii
+    maze = LabyrintheAscii("""
+#########
+I   #   O
+# # # ###
+# #     O
+#########
+""")
+    print(maze)
+    print(maze.sorties())
+    print(list(astar(maze)))
@@ -10,19 +10,87 @@ Date: 2021-04-10
 
 
 import logging as log
+import random
 import time
+import tracemalloc
 
 import numpy as np
 import matplotlib.pyplot as plt
 
 import generateur_ab as ab
+import labyrinthe
 from solveur_astar_naif import astar as astar_naif
 from solveur_astar_heapq import astar as astar_heapq
 from solveur_astar_v3 import astar as astar_v3
-from solveur_astar_v3 import null_distance
+from solveur_astar_v3 import null_distance, manhattan_distance
+from solveur_astar_v3 import QueuePrioritaire, QueueSeaux, QueueIndexee
+from etat_recherche import EtatDict
+from solveur_astar_v4 import astar as astar_v4
+from solveur_bidirectionnel import astar as astar_bidir
+from solveur_jps import astar as astar_jps
+from solveur_lpa import PlanificateurLPA
+from solveur_memoire_bornee import ida, sma
+from heuristique_alt import heuristique_alt
+from champ_distances import chemins
+from solveur_requetes import solve_many
+from solveur_sorties import astar as astar_sorties
+from solveur_salles import astar as astar_salles
 # from solveur_astar_heapq import dijkstra
 
 
+class CompteurExpansions(labyrinthe.Labyrinthe):
+    """
+    Labyrinthe "enveloppe" comptant les noeuds développés par un solveur.
+
+    Les solveurs appellent grid.neighbours une fois par noeud développé: on
+    compte donc ces appels, tout le reste est délégué au labyrinthe d'origine.
+    """
+
+    def __init__(self, grid):
+        """Envelopper le labyrinthe grid."""
+        self.grid = grid
+        self.start = grid.start
+        self.out = grid.out
+        self.expansions = 0
+
+    def __contains__(self, cell):
+        return cell in self.grid
+
+    def __str__(self):
+        return str(self.grid)
+
+    def neighbours(self, cell):
+        self.expansions += 1
+        return self.grid.neighbours(cell)
+
+    def connectes(self, cell1, cell2):
+        return self.grid.connectes(cell1, cell2)
+
+    def dimensions(self):
+        return self.grid.dimensions()
+
+    def matrice(self):
+        return self.grid.matrice()
+
+
+def comparer_expansions(size, solvers, rwds=(0, 0.01, 0.1, 0.3)):
+    """
+    Comparer temps et nombre de noeuds développés de plusieurs solveurs.
+
+    Entrée: solvers est un dict nom -> solveur
+    """
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        for nom, solver in solvers.items():
+            compteur = CompteurExpansions(maze)
+            start_time = time.time()
+            solver(compteur)
+            duration = time.time() - start_time
+            print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {nom:>14}:",
+                  f"solve={duration:.4f}s",
+                  f"noeuds développés={compteur.expansions}")
+
+
 def single_test(size, solver, solver2=None, ratio_wall_destr=0):
     """Effectuer un test avec une grille aléatoire de la taille donnée."""
     log.debug("starting single test size %d" % size)
@@ -122,6 +190,12 @@ def analyze(size, gent, solt, solt2=None, view=None):
     plt.show()
 
 
+def gain(solt, solt2):
+    """Afficher le gain de temps total du solveur 2 par rapport au solveur 1."""
+    print(f"le solveur 2 est {sum(solt) / sum(solt2):.2f} fois plus rapide",
+          "que le solveur 1 (temps total)")
+
+
 def comparer_solveurs(maxsize, rwd):
     """Comparer les différentes implémentations, sans graphique."""
     print("* Comparaison implémentation v1 (sans heapq) "
@@ -139,6 +213,298 @@ def comparer_solveurs(maxsize, rwd):
     analyze(sz, gent, solt, solt2=solt2,
             view=("v2", "v3"))
 
+    print("* Comparaison implémentation v3 (heapq amélioré) "
+          "vs v4 (indices entiers) *")
+    print("  Algo1 = A* v3, Algo2 = A* v4")
+    sz, gent, solt, solt2 = time_tests(astar_v3, maxsize, solver2=astar_v4,
+                                       rwd=rwd)
+    analyze(sz, gent, solt, solt2=solt2,
+            view=("v3", "v4"))
+
+    print("* Comparaison v3 avec heapq vs v3 avec queue à seaux (Dial) *")
+    print("  Algo1 = A* v3 heapq, Algo2 = A* v3 seaux")
+    sz, gent, solt, solt2 = time_tests(lambda mz:
+                                       astar_v3(mz, queue=QueuePrioritaire),
+                                       maxsize, solver2=astar_v3, rwd=rwd)
+    gain(solt, solt2)
+    analyze(sz, gent, solt, solt2=solt2,
+            view=("v3 heapq", "v3 seaux"))
+
+
+def mesurer_queue(queue):
+    """Retourner une sous-classe de queue qui mémorise sa taille maximale."""
+    class QueueMesuree(queue):
+        taille_max = 0
+
+        def insert(self, priority, node):
+            super().insert(priority, node)
+            QueueMesuree.taille_max = max(QueueMesuree.taille_max, len(self))
+    return QueueMesuree
+
+
+def comparer_queues(size, rwds=(0, 0.1, 0.3, 1)):
+    """Comparer temps et taille maximale des queues prioritaires de A* v3."""
+    print("* Comparaison des queues de A* v3: heapq avec entrées périmées,",
+          "tas indexé (decrease-key), seaux *")
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        for queue in (QueuePrioritaire, QueueIndexee, QueueSeaux):
+            start_time = time.time()
+            astar_v3(maze, queue=queue)
+            duration = time.time() - start_time
+            queue_mesuree = mesurer_queue(queue)
+            astar_v3(maze, queue=queue_mesuree)
+            print(f"{size:4d}x{size:<4d} rwd={rwd:.2f}",
+                  f"{queue.__name__:>16}: solve={duration:.4f}s",
+                  f"taille max={queue_mesuree.taille_max}")
+
+
+def comparer_bidirectionnel(size, rwds=(0, 0.01, 0.1, 0.3)):
+    """Comparer A* v3 et A* bidirectionnel."""
+    print("* Comparaison A* v3 vs A* bidirectionnel *")
+    comparer_expansions(size, {"v3": astar_v3, "bidirectionnel": astar_bidir},
+                        rwds)
+
+
+def comparer_jps(size, rwds=(0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,
+                             1)):
+    """Comparer A* v3 (heapq et seaux) et Jump Point Search selon rwd."""
+    print("* Comparaison A* v3 vs Jump Point Search selon destruction_murs *")
+    solvers = {"v3 heapq": lambda mz: astar_v3(mz, queue=QueuePrioritaire),
+               "v3 seaux": astar_v3,
+               "JPS": astar_jps}
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        durations = []
+        for solver in solvers.values():
+            start_time = time.time()
+            solver(maze)
+            durations.append(time.time() - start_time)
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f}:",
+              *(f"{nom}={duration:.4f}s"
+                for nom, duration in zip(solvers, durations)))
+
+
+def comparer_replanification(size, n_murs=50):
+    """Comparer A* v3 relancé et LPA* après chaque mur détruit."""
+    print("* Comparaison A* v3 vs LPA* après destruction de murs un à un *")
+    maze = ab.Maze(size, size, 0)
+    planificateur = PlanificateurLPA(maze)
+    planificateur.replan()
+    murs = [tuple(cell) for cell in
+            (np.argwhere(~maze.passable[1:-1, 1:-1]) + 1).tolist()]
+    duree_v3 = duree_lpa = 0
+    for _ in range(n_murs):
+        cell = murs.pop(random.randrange(len(murs)))
+        maze.set_passable(cell)
+        start_time = time.time()
+        planificateur.update_cells([cell])
+        planificateur.replan()
+        duree_lpa += time.time() - start_time
+        start_time = time.time()
+        list(astar_v3(maze))
+        duree_v3 += time.time() - start_time
+    print(f"{size:4d}x{size:<4d} {n_murs} murs:",
+          f"v3={duree_v3 / n_murs:.4f}s LPA*={duree_lpa / n_murs:.4f}s",
+          f"par requête (gain {duree_v3 / duree_lpa:.2f})")
+
+
+def comparer_memoire(size=2000, rwd=0.3, caps_ida=(10**6,),
+                     caps_sma=(10**6, 10**5, 10**4), method="kruskal"):
+    """
+    Comparer temps et pic de mémoire de A* v3, IDA* et SMA*.
+
+    La mémoire est mesurée avec tracemalloc, après génération du labyrinthe
+    (par Kruskal par défaut, seul générateur assez rapide à cette taille);
+    caps_ida et caps_sma donnent les valeurs de max_memory_nodes essayées.
+
+    Mesuré en 2000x2000, rwd=0.3 (chemin de 7997 cellules):
+    - v3: 38.7s, 127.9Mo
+    - IDA* 10**6: 23.2s, 107.3Mo
+    - SMA* 10**6: 165.4s, 602.0Mo
+    - SMA* 10**5: 323.7s, 141.0Mo
+    - SMA* 10**4: 526.7s, 15.4Mo
+    IDA* avec 10**5 ne termine pas en 45 minutes (la table de transposition
+    ne garde plus assez de cellules), d'où le seul 10**6 par défaut.
+    """
+    print("* Comparaison temps / mémoire: A* v3 vs IDA* et SMA* bornés *")
+    maze = ab.Maze(size, size, rwd, method=method)
+    maze.neighbours(maze.start)  # masque des voisins calculé hors mesure
+    solvers = {"v3": astar_v3}
+    for cap in caps_ida:
+        solvers[f"IDA* {cap}"] = (lambda mz, cap=cap:
+                                  ida(mz, max_memory_nodes=cap))
+    for cap in caps_sma:
+        solvers[f"SMA* {cap}"] = (lambda mz, cap=cap:
+                                  sma(mz, max_memory_nodes=cap))
+    for nom, solver in solvers.items():
+        tracemalloc.start()
+        start_time = time.time()
+        try:
+            longueur = len(list(solver(maze)))
+        except ValueError:  # chemin trop long pour la mémoire allouée
+            longueur = None
+        duration = time.time() - start_time
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {nom:>13}:",
+              f"chemin={longueur} temps={duration:.3f}s",
+              f"pic={pic / 2**20:.1f}Mo")
+
+
+def comparer_alt(size, rwds=(0, 0.01, 0.1, 0.3), n_reperes=8):
+    """Comparer A* v3 avec distance de Manhattan et avec heuristique ALT."""
+    print("* Comparaison A* v3: distance de Manhattan vs heuristique ALT *")
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        start_time = time.time()
+        alt = heuristique_alt(maze, n_reperes)
+        alt.distance(maze.start, maze.out)  # bornes vers la sortie
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f}",
+              f"tables ALT ({n_reperes} repères):",
+              f"{time.time() - start_time:.4f}s")
+        for nom, distance in (("Manhattan", manhattan_distance),
+                              ("ALT", alt.distance)):
+            compteur = CompteurExpansions(maze)
+            start_time = time.time()
+            astar_v3(compteur, distance=distance)
+            duration = time.time() - start_time
+            print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {nom:>14}:",
+                  f"solve={duration:.4f}s",
+                  f"noeuds développés={compteur.expansions}")
+
+
+def comparer_champ(size, n_departs=100, rwds=(0, 0.1, 1)):
+    """Comparer A* v3 par départ et un seul champ de distances vectorisé."""
+    print("* Comparaison A* v3 vs champ de distances, plusieurs départs *")
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        cellules = np.argwhere(maze.matrice())
+        departs = [tuple(cellule) for cellule in cellules[
+            np.random.randint(len(cellules), size=n_departs)].tolist()]
+        start_time = time.time()
+        for depart in departs:
+            maze.start = depart
+            list(astar_v3(maze))
+        duree_v3 = time.time() - start_time
+        start_time = time.time()
+        for _ in chemins(maze, departs):
+            pass
+        duree_champ = time.time() - start_time
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {n_departs} départs:",
+              f"v3={duree_v3:.4f}s champ={duree_champ:.4f}s")
+
+
+def comparer_requetes(size, n_requetes=1000, n_sorties=5, rwd=0.1):
+    """
+    Comparer le débit (requêtes par seconde) de A* v3 et de solve_many.
+
+    Les requêtes ont des départs aléatoires et une sortie parmi n_sorties.
+    """
+    print("* Débit: A* v3 requête par requête vs solve_many groupé *")
+    maze = ab.Maze(size, size, rwd)
+    cellules = [tuple(cellule) for cellule in
+                np.argwhere(maze.matrice()).tolist()]
+    sorties = random.sample(cellules, n_sorties)
+    requetes = [(random.choice(cellules), random.choice(sorties))
+                for _ in range(n_requetes)]
+    start_time = time.time()
+    for _ in solve_many(maze, requetes):
+        pass
+    debit_groupe = n_requetes / (time.time() - start_time)
+    n_v3 = min(n_requetes, 50)  # A* v3 est trop lent pour tout refaire
+    start_time = time.time()
+    for depart, sortie in requetes[:n_v3]:
+        maze.start, maze.out = depart, sortie
+        try:
+            list(astar_v3(maze))
+        except ValueError:
+            pass
+    debit_v3 = n_v3 / (time.time() - start_time)
+    print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {n_sorties} sorties:",
+          f"v3={debit_v3:.1f} requêtes/s",
+          f"solve_many={debit_groupe:.1f} requêtes/s")
+
+
+def comparer_sorties(size, n_sorties=5, rwds=(0, 0.1, 0.3)):
+    """Comparer un A* v3 par sortie et une seule recherche multi-sorties."""
+    print("* Comparaison: A* v3 par sortie vs A* vers la plus proche *")
+    for rwd in rwds:
+        maze = ab.Maze(size, size, rwd)
+        cellules = [tuple(cellule) for cellule in
+                    np.argwhere(maze.matrice()).tolist()]
+        sorties = tuple(random.sample(cellules, n_sorties))
+        start_time = time.time()
+        for sortie in sorties:
+            maze.out = sortie
+            try:
+                list(astar_v3(maze))
+            except ValueError:
+                pass
+        duree_v3 = time.time() - start_time
+        maze.out = sorties
+        start_time = time.time()
+        list(astar_sorties(maze))
+        duree_sorties = time.time() - start_time
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {n_sorties} sorties:",
+              f"v3={duree_v3:.4f}s plus proche={duree_sorties:.4f}s")
+
+
+def comparer_salles(sizes=(100, 200, 400)):
+    """Comparer A* v4 sur les cellules et A* sur le graphe des rooms."""
+    print("* Comparaison: A* v4 (cellules) vs A* sur les rooms *")
+    for size in sizes:
+        maze = ab.Maze(size, size)
+        start_time = time.time()
+        list(astar_v4(maze))
+        duree_v4 = time.time() - start_time
+        start_time = time.time()
+        list(astar_salles(maze))
+        duree_salles = time.time() - start_time
+        print(f"{size:4d}x{size:<4d}: v4={duree_v4:.4f}s",
+              f"rooms={duree_salles:.4f}s",
+              f"gain={duree_v4 / duree_salles:.1f}x")
+
+
+def comparer_etats(size=300, rwd=0, method="wilson"):
+    """
+    Comparer temps et pic de mémoire de A* v3 selon l'état de recherche.
+
+    v3 avec EtatRecherche (compact) ou EtatDict (dict), face aux solveurs
+    heapq et v4; la mémoire est mesurée avec tracemalloc.
+    """
+    print("* Comparaison: état de recherche compact vs dict *")
+    maze = ab.Maze(size, size, rwd, method=method)
+    maze.neighbours(maze.start)  # masque des voisins calculé hors mesure
+    solvers = {"v3 compact": astar_v3,
+               "v3 dict": lambda mz: astar_v3(mz, etat=EtatDict),
+               "heapq": astar_heapq,
+               "v4": astar_v4}
+    for nom, solver in solvers.items():
+        start_time = time.time()
+        list(solver(maze))
+        duration = time.time() - start_time
+        tracemalloc.start()
+        list(solver(maze))
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{size:4d}x{size:<4d} rwd={rwd:.2f} {nom:>10}:",
+              f"temps={duration:.3f}s pic={pic / 2**20:.1f}Mo")
+
+
+def comparer_generateurs(sizes=(50, 100, 200, 400),
+                         methods=("aldous-broder", "wilson", "kruskal")):
+    """Comparer le débit (rooms générées par seconde) des générateurs."""
+    print("* Comparaison des générateurs de generateur_ab.Maze *")
+    for size in sizes:
+        debits = []
+        for method in methods:
+            start_time = time.time()
+            ab.Maze(size, size, method=method)
+            duree = time.time() - start_time
+            debits.append(f"{method}={size * size / duree:,.0f} rooms/s")
+        print(f"{size:4d}x{size:<4d}:", " ".join(debits))
+
 
 def comparer_distances(maxsize, rwd):
     """Comparer choix de distance heuristique dans même algo."""
@@ -5,6 +5,7 @@ Author: Dalker
 Date: 2021.04-05
 """
 
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import ListedColormap
 
@@ -46,6 +47,7 @@ class AstarView():
     - axes: matplotlib Axes
     - grid: Grid
     - fringe: access to object that can be tested with "cell in fringe"
+              (None if explored gives its own fringe with explored.marge())
     - explored: access to object that can be tested with "cell in explored"
     Tous trois sont des références aux objects manipulés en cours d'algorithme.
     Les modifications sont donc visibles automatiquement.
@@ -58,18 +60,14 @@ class AstarView():
         else:
             self.axes = axes
         self.grid = grid
-        lignes = str(grid).split("\n")
-        n_rows = len(lignes)
-        n_cols = max(len(ligne) for ligne in lignes)
+        matrice = grid.matrice()
+        n_rows, n_cols = matrice.shape
         self.max_cost = int(3 * (n_rows * n_cols)**.5)
         self.update_freq = int((n_rows * n_cols)**.5) // 2
         self.update_next = 1
         self.fringe = fringe
         self.explored = explored
-        self._matrix = [[UNKNOWN if (row, col) in self.grid
-                         else WALL
-                         for col in range(n_cols)]
-                        for row in range(n_rows)]
+        self._matrix = np.where(matrice, UNKNOWN, WALL)
         self._image = self.axes.matshow(self._matrix,
                                         cmap=COLORMAP,
                                         # cmap=plt.get_cmap("twilight")
@@ -95,8 +93,11 @@ class AstarView():
             self.update_next = self.update_freq
             for row, col in self.explored:
                 self._matrix[row][col] = self.colornum(row, col)
-            for cell in self.fringe:
-                row, col = cell[1]
+            if self.fringe is None:
+                fringe = self.explored.marge()
+            else:
+                fringe = (cell[1] for cell in self.fringe)
+            for row, col in fringe:
                 self._matrix[row][col] = FRINGE
             self._image.set_data(self._matrix)
             plt.pause(0.000001)